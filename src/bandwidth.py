@@ -0,0 +1,131 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import threading
+import time
+from typing import Optional
+
+from .custom_threading import CancellationToken
+from .progress import TransferMeter
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing ``rate`` bytes/s on average, with bursts of
+    up to ``burst`` bytes. A ``rate`` of ``0`` means unlimited.
+    """
+
+    def __init__(self, rate=0, burst: Optional[int] = None):
+        self._lock = threading.Lock()
+        self.rate = 0.0
+        self._tokens = None
+        self._updated_at = time.monotonic()
+        self.set_rate(rate, burst)
+
+    def set_rate(self, rate: float, burst: Optional[int] = None):
+        """
+        Change the bytes/s allowed, ``0`` for unlimited. ``burst`` defaults to one second worth of data.
+        """
+        with self._lock:
+            self._refill()
+            self.rate = max(0.0, float(rate))
+            #* one second worth of data by default
+            self.burst = float(burst if burst is not None else max(self.rate, 64 * 1024))
+            self._tokens = self.burst if self._tokens is None else min(self._tokens, self.burst)
+
+    def consume(self, byte_count: int, cancel_token: Optional[CancellationToken] = None):
+        """
+        Take ``byte_count`` tokens, blocking until they are available.
+        Tokens may go negative so a single large block is never stuck.
+        """
+        with self._lock:
+            if self.rate <= 0:
+                return
+            self._refill()
+            self._tokens -= byte_count
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            if cancel_token is not None:
+                cancel_token.wait(delay)
+            else:
+                time.sleep(delay)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self._tokens is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+class BandwidthBudget:
+    """
+    Process-wide download budget of ``total_rate`` bytes/s shared by media
+    downloads and interactive UI assets (thumbnails, avatars).
+    Media downloads get what UI assets are not using, but never more than
+    ``total_rate`` minus an ``interactive_share`` always kept for the UI. Usage:
+    ------::
+
+        bandwidth.configure(total_rate=2 * MB, interactive_share=0.2)
+        bandwidth.consume_media(len(block))  # in download threads, may block
+        bandwidth.add_interactive(len(reply_data))  # UI assets are only measured
+    """
+
+    def __init__(self, total_rate=0, interactive_share=0.2):
+        self.interactive = TransferMeter(window=2.0)
+        self.media = TokenBucket()
+        self._lock = threading.Lock()
+        self.configure(total_rate, interactive_share)
+
+    def configure(self, total_rate: float, interactive_share: float):
+        """
+        ``total_rate`` : bytes/s, ``0`` for unlimited.
+        ``interactive_share`` : fraction of ``total_rate`` reserved for UI assets.
+        """
+        with self._lock:
+            self.total_rate = max(0.0, float(total_rate))
+            self.interactive_share = min(max(float(interactive_share), 0.0), 0.9)
+        self._update_media_rate()
+
+    def media_rate(self) -> float:
+        """
+        Return the bytes/s currently allowed for media downloads, ``0`` if unlimited.
+        """
+        if self.total_rate <= 0:
+            return 0.0
+        reserved = max(self.total_rate * self.interactive_share, self.interactive.rate())
+        #* downloads never stop completely
+        return max(self.total_rate - reserved, self.total_rate * 0.1)
+
+    def consume_media(self, byte_count: int, cancel_token: Optional[CancellationToken] = None):
+        """
+        Wait until ``byte_count`` media bytes fit in what interactive traffic leaves over.
+        """
+        self._update_media_rate()
+        self.media.consume(byte_count, cancel_token)
+
+    def add_interactive(self, byte_count: int):
+        """
+        Record ``byte_count`` bytes of interactive traffic, e.g. a thumbnail.
+        """
+        self.interactive.add(byte_count)
+
+    def _update_media_rate(self):
+        rate = self.media_rate()
+        if rate != self.media.rate:
+            self.media.set_rate(rate)
+
+
+#* shared by every download of the app, unlimited by default
+bandwidth = BandwidthBudget()
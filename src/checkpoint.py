@@ -0,0 +1,69 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from .resources import get_cache_dir
+
+
+class FeedCheckpoint:
+    """
+    Newest video seen in the feed of each browser profile, persisted as JSON.
+    """
+
+    def __init__(self, path=None):
+        self._path = Path(path or Path(get_cache_dir(), "checkpoints.json"))
+        self._lock = threading.Lock()
+        self._checkpoints = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self._path, "r", encoding="utf8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = self._path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf8") as f:
+            json.dump(self._checkpoints, f)
+        os.replace(tmp_path, self._path)
+
+    def get(self, profile: str) -> Optional[dict]:
+        """
+        Return ``{"video_id": ..., "time": ...}`` for ``profile``, if set.
+        """
+        with self._lock:
+            return self._checkpoints.get(str(profile))
+
+    def set(self, profile: str, video_id: str, timestamp: int):
+        """
+        Store ``video_id`` as the newest video seen for ``profile``.
+        """
+        with self._lock:
+            self._checkpoints[str(profile)] = {"video_id": str(video_id), "time": int(timestamp)}
+            self._save()
+
+    def clear(self, profile: str):
+        """
+        Forget the checkpoint for ``profile``.
+        """
+        with self._lock:
+            if self._checkpoints.pop(str(profile), None) is not None:
+                self._save()
@@ -1,3 +1,5 @@
+import inspect
+import subprocess
 import sys
 import traceback
 from PyQt5 import QtCore
@@ -6,6 +8,125 @@ import traceback
 import sys
 
 
+class Cancelled(Exception):
+    """
+    Raised by ``raise_if_cancelled`` in jobs whose token was cancelled.
+    """
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation shared by a job and everything it starts.
+    Long running code checks it regularly. Child processes registered with
+    ``add_process`` are terminated on ``cancel``. Usage:
+    ------::
+
+        token = CancellationToken()
+        for item in items:
+            token.raise_if_cancelled()
+            ...
+        token.cancel()  # from any thread
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._children = []
+        #* cancelled to run again later, partial results are kept
+        self.preempted = False
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """
+        Cancel the job, terminating its registered processes and cancelling
+        its ``child`` tokens.
+        """
+        self._event.set()
+        with self._lock:
+            processes = list(self._processes)
+            children, self._children = self._children, []
+        for process in processes:
+            terminate_process(process)
+        for child in children:
+            child.cancel()
+
+    def preempt(self):
+        """
+        Cancel a job that will be started again, e.g. a download deprioritized
+        while running.
+        """
+        self.preempted = True
+        self.cancel()
+
+    def child(self) -> "CancellationToken":
+        """
+        Return a token cancelled along with this one, which can also be cancelled
+        on its own, e.g. one per job of a run.
+        """
+        token = CancellationToken()
+        with self._lock:
+            if not self.is_cancelled:
+                self._children.append(token)
+                return token
+        token.cancel()
+        return token
+
+    def release_child(self, token: "CancellationToken"):
+        """
+        Forget a ``child`` token whose job is done.
+        """
+        with self._lock:
+            if token in self._children:
+                self._children.remove(token)
+
+    def raise_if_cancelled(self):
+        """
+        Raise ``Cancelled`` if the job was cancelled.
+        """
+        if self._event.is_set():
+            raise Cancelled()
+
+    def wait(self, timeout=None) -> bool:
+        """
+        Sleep up to ``timeout`` seconds. Return ``True`` if cancelled meanwhile.
+        """
+        return self._event.wait(timeout)
+
+    def add_process(self, process: subprocess.Popen):
+        """
+        Register a child ``process`` to be terminated on ``cancel``, right away
+        if already cancelled.
+        """
+        with self._lock:
+            self._processes.add(process)
+        if self.is_cancelled:
+            terminate_process(process)
+
+    def remove_process(self, process: subprocess.Popen):
+        """
+        Forget a ``process`` that has exited.
+        """
+        with self._lock:
+            self._processes.discard(process)
+
+
+def terminate_process(process: subprocess.Popen, timeout=2):
+    """
+    Terminate ``process``, killing it if it doesn't exit within ``timeout`` seconds.
+    """
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
 class WorkerSignals(QtCore.QObject):
     """
     Defines the signals available from a running worker thread.
@@ -38,11 +159,14 @@ class Worker(QtCore.QRunnable):
         self.args = args
         self.kwargs = kwargs
         self.signals = WorkerSignals()
-        self.event_stop = threading.Event()
+        self.cancel_token = CancellationToken()
+        self.event_stop = self.cancel_token._event
         self.is_killed = False
         
         # # Add the callback to our kwargs
         # self.kwargs['progress_callback'] = self.signals.progress
+        if "cancel_token" in inspect.signature(fn).parameters:
+            self.kwargs.setdefault("cancel_token", self.cancel_token)
 
     @QtCore.pyqtSlot()
     def run(self):
@@ -51,6 +175,8 @@ class Worker(QtCore.QRunnable):
             result = self.fn(*self.args, **self.kwargs)
             self.signals.result.emit(result)
             self.signals.finished.emit()
+        except Cancelled:
+            print("Thread cancelled")
         except:
             traceback.print_exc()
             exctype, value = sys.exc_info()[:2]
@@ -64,4 +190,4 @@ class Worker(QtCore.QRunnable):
         """
         print("Thread killed")
         self.is_killed = True
-        self.event_stop.set()
\ No newline at end of file
+        self.cancel_token.cancel()
\ No newline at end of file
@@ -18,13 +18,15 @@ from PyQt5.QtCore import (
     QByteArray, QEasingCurve, QObject, QPoint, QPointF, QPropertyAnimation, QRect, QRectF, QSequentialAnimationGroup,
     QSize, QTimer, QVariantAnimation, Qt, QUrl, pyqtProperty, pyqtSignal, pyqtSlot
 )
-from PyQt5.QtGui import (QBrush, QColor, QFont, QIcon, QImage, QMouseEvent, QPainter, QPainterPath, QPaintEvent, QPen, QPixmap)
+from PyQt5.QtGui import (QBrush, QColor, QFont, QIcon, QImage, QMouseEvent, QPainter, QPaintEvent, QPixmap)
 from PyQt5.QtWidgets import (
     QApplication, QCheckBox, QFrame, QGraphicsDropShadowEffect, QGridLayout, QHBoxLayout, QLabel, QLayout,
-    QListWidgetItem, QMainWindow, QPushButton, QScrollArea, QSizePolicy, QSystemTrayIcon, QToolButton, QVBoxLayout,
-    QWidget
+    QListWidgetItem, QMainWindow, QProgressBar, QPushButton, QScrollArea, QSizePolicy, QSystemTrayIcon, QToolButton,
+    QVBoxLayout, QWidget
 )
 
+from .image_decoder import decode_image, round_image
+
 
 class Spoiler(QWidget):
     """
@@ -306,9 +308,14 @@ class CustomQWidget(QWidget):
 
         self.frame = CustomFrame()
 
+        #* download progress, only shown while downloading
+        self.progressBar = QProgressBar(textVisible=False, maximum=100, visible=False)
+        self.progressBar.setFixedHeight(4)
+
         self.textQVBoxLayout = QVBoxLayout()
         self.textQVBoxLayout.addWidget(self.textUpQLabel)
         self.textQVBoxLayout.addWidget(self.authorQLabel)
+        self.textQVBoxLayout.addWidget(self.progressBar)
 
         self.allQGrid = QGridLayout()
         # icon will be set later, if a reply is received
@@ -369,6 +376,14 @@ class CustomQWidget(QWidget):
         widget.setGraphicsEffect(self.shadow_effects[self.shadow_effects_counter])
         self.shadow_effects_counter += 1
 
+    @pyqtSlot(int)
+    def setProgress(self, percent):
+        """
+        Shows download progress, hiding the bar once complete.
+        """
+        self.progressBar.setValue(percent)
+        self.progressBar.setVisible(percent < 100)
+
     def setTextUp(self, text):
         """
         Adds a title up next to thumbnail.
@@ -376,15 +391,26 @@ class CustomQWidget(QWidget):
         self.textUpQLabel.setText(text)
         self.textUpQLabel.setSizePolicy(QSizePolicy(QSizePolicy.Minimum, QSizePolicy.MinimumExpanding))
 
-    def set_thumbnail(self, img: QPixmap):
+    def thumbnail_size(self):
+        """
+        Returns the ``(width, height)`` thumbnails are scaled to.
         """
-        Sets an image as thumbnail.
+        return self.thumbnailQLabel.width(), self.thumbnailQLabel.height()
+
+    def scale_thumbnail(self, img: QPixmap) -> QPixmap:
+        """
+        Returns ``img`` scaled to fit the thumbnail.
         """
-        # img = QPixmap(img)
         # important to use a SmoothTransformation
-        thumbnail_width = self.thumbnailQLabel.width()
-        thumbnail_height = self.thumbnailQLabel.height()
-        img = img.scaled(thumbnail_width, thumbnail_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        thumbnail_width, thumbnail_height = self.thumbnail_size()
+        return img.scaled(thumbnail_width, thumbnail_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    def set_thumbnail(self, img: QPixmap, scaled=False):
+        """
+        Sets an image as thumbnail. ``scaled`` : ``img`` already fits, see ``scale_thumbnail``.
+        """
+        if not scaled:
+            img = self.scale_thumbnail(img)
         self.thumbnailQLabel.setPixmap(img)
         self.thumbnailQLabel.setAlignment(Qt.AlignTop)
         self.thumbnailQLabel.setContentsMargins(0, 0, 20, 0)
@@ -422,42 +448,40 @@ class RoundLabelImage(QLabel):
             #* use a local path to load the image if available
             self.set_round_label(from_local_path=True)
 
-    def set_round_label(self, data: QByteArray = None, from_local_path=False):
+    def cache_key(self, url: str):
         """
-        Draws a round label using a given ``data`` response.
+        Returns the ``PixmapCache`` key of the round image of ``url`` for this label.
         """
-        if from_local_path:
-            self.source = QPixmap(self._path)
-        else:
-            self.source = QPixmap()
-            self.source.loadFromData(data)
-        pixmap_size = self._size - self._border_width * 2
-        p = self.source.scaled(pixmap_size, pixmap_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        border_color = QtGui.QColor(self._border_color).rgba() if self._border_color is not None else None
+        return (url, self._size, self._size, ("round", self._border_width, border_color, self._antialiasing))
 
-        self.target = QPixmap(self.size())
-        self.target.fill(Qt.transparent)
+    def set_round_label(self, data: QByteArray = None, from_local_path=False, pixmap: QPixmap = None):
+        """
+        Draws a round label using a given ``data`` response.
+        ``pixmap`` : a round image already rendered by ``render_round_label``.
+        """
+        if pixmap is None:
+            pixmap = self.render_round_label(data, from_local_path)
+        self.target = pixmap
+        self.setPixmap(self.target)
 
-        painter = QPainter(self.target)
-        if self._antialiasing:
-            painter.setRenderHint(QPainter.Antialiasing, True)
-            painter.setRenderHint(QPainter.HighQualityAntialiasing, True)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+    def render_round_label(self, data: QByteArray = None, from_local_path=False) -> QPixmap:
+        """
+        Returns the round image of a given ``data`` response.
+        """
+        image = QImage(self._path) if from_local_path else QImage.fromData(data)
+        return QPixmap.fromImage(self.round_image(image))
 
-        rect = QtCore.QRectF(self.rect())
-        if self._border_width:
-            painter.setPen(Qt.NoPen)
-            painter.setBrush(QtGui.QColor(self._border_color))
-            painter.drawEllipse(rect)
-            rect.adjust(self._border_width, self._border_width, -self._border_width, -self._border_width)
-
-        painter_path = QPainterPath()
-        painter_path.addEllipse(rect)
-        painter.setClipPath(painter_path)
+    def decode_round_image(self, data) -> QImage:
+        """
+        Returns the round image of a given ``data`` response, decoded straight to
+        the label size. Does not touch the widget, so it can run in a worker thread.
+        """
+        pixmap_size = self._size - self._border_width * 2
+        return self.round_image(decode_image(data, pixmap_size, pixmap_size))
 
-        painter.drawPixmap(self._border_width, self._border_width, p)
-        painter.end()  # must be called if there are multiple painters
-        painter = None
-        self.setPixmap(self.target)
+    def round_image(self, image: QImage) -> QImage:
+        return round_image(image, self._size, self._border_width, self._border_color, self._antialiasing)
 
 class CustomImageButton(QPushButton):
     """
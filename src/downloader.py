@@ -0,0 +1,78 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from youtube_dl import YoutubeDL
+
+
+class DownloadSession:
+    """
+    Long-lived youtube-dl session handling a stream of download jobs.
+    Each thread reuses its own ``YoutubeDL`` built from ``params``, so extractors
+    and options are set up once per worker instead of once per track.
+    Job options such as ``outtmpl`` and ``format`` only apply to that job. Usage:
+    ------::
+
+        session = DownloadSession({"logger": MyLogger()})
+        # in any worker thread
+        info_dict, filename = session.download(url, {"outtmpl": ..., "format": "bestaudio"}, hook)
+    """
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None):
+        self.params = dict(params or {})
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.instances = 0
+        self.jobs = 0
+
+    def _youtube_dl(self) -> YoutubeDL:
+        """
+        Return the ``YoutubeDL`` instance of the calling thread.
+        """
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = self._local.ydl = YoutubeDL(dict(self.params))
+            with self._lock:
+                self.instances += 1
+        return ydl
+
+    def download(
+        self,
+        url: str,
+        options: Dict[str, Any],
+        progress_hook: Optional[Callable[[dict], None]] = None,
+    ) -> Tuple[dict, str]:
+        """
+        Download ``url`` with the job ``options`` on top of the session params.
+        Return its info dict and downloaded file name.
+        """
+        ydl = self._youtube_dl()
+        ydl.params.update(options)
+        ydl._progress_hooks = [progress_hook] if progress_hook is not None else []
+        with self._lock:
+            self.jobs += 1
+        try:
+            info_dict = ydl.extract_info(url, download=True)
+            return info_dict, ydl.prepare_filename(info_dict)
+        finally:
+            #* back to the session params for the next job
+            ydl._progress_hooks = []
+            for key in options:
+                if key in self.params:
+                    ydl.params[key] = self.params[key]
+                else:
+                    ydl.params.pop(key, None)
@@ -0,0 +1,213 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import os
+import threading
+from pathlib import Path
+from sys import platform
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+from .resources import get_cache_dir
+
+FEED_URL = "https://www.youtube.com/feed/subscriptions"
+
+
+def default_user_data():
+    """
+    Return the default Chrome user data folder for the current platform.
+    """
+    if platform == "win32":
+        return os.path.expanduser("~") + r"\AppData\Local\Google\Chrome\User Data"
+    elif platform == "linux":
+        return os.path.expanduser("~") + r"/.config/google-chrome"
+    return None
+
+
+class DriverService:
+    """
+    Keeps a single warm headless Chrome with the subscriptions feed open
+    across scrapes. The browser is restarted if it is found dead.
+    Scrapes take turns with ``acquire`` and ``release``. Usage:
+    ------::
+
+        service = DriverService()
+        service.acquire()
+        driver = service.open_feed()  # started on first use, reused afterwards
+        ...
+        service.release()
+        service.quit()  # on app exit
+    """
+
+    def __init__(self, user_data=None, driver_cache_path=None):
+        self._user_data = user_data
+        self._driver_cache_path = Path(driver_cache_path or Path(get_cache_dir(), "chromedriver.json"))
+        self._lock = threading.RLock()
+        self._session = threading.Lock()
+        self._feed_tab = None
+        self.driver = None
+
+    @property
+    def user_data(self):
+        return self._user_data
+
+    @user_data.setter
+    def user_data(self, user_data):
+        if self.user_data == user_data:
+            return
+        self._user_data = user_data
+        self.quit()  # the running browser uses the previous profile
+
+    def chrome_driver_path(self, refresh=False):
+        """
+        Return the chromedriver path, resolved online only when the cached one is
+        gone or ``refresh`` is set, e.g. after Chrome updated itself.
+        """
+        if not refresh:
+            cached_path = self.cached_driver_path()
+            if cached_path is not None:
+                return cached_path
+
+        # ? automatic driver detection
+        chrome_driver_path = ChromeDriverManager().install()
+        with open(self._driver_cache_path, "w", encoding="utf8") as f:
+            json.dump({"path": chrome_driver_path}, f)
+        return chrome_driver_path
+
+    def cached_driver_path(self):
+        """
+        Return the chromedriver path resolved by a previous run, if it still exists.
+        """
+        try:
+            with open(self._driver_cache_path, "r", encoding="utf8") as f:
+                cached_path = json.load(f)["path"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return cached_path if os.path.isfile(cached_path) else None
+
+    def start(self):
+        """
+        Start a new browser. Return ``False`` if the user data folder is not valid.
+        """
+        if self._user_data is None:
+            self._user_data = default_user_data()
+
+        options = webdriver.ChromeOptions()
+        # options.add_argument("--no-sandbox")  # Bypass OS security model
+        # options.add_argument("--disable-gpu")  # applicable to windows os only
+        options.add_argument("--disable-dev-shm-usage")  # overcome limited resource problems
+        options.add_argument("--disable-extensions")
+        options.add_argument("--window-size=1920,1080")  # enable clicking in headles
+        options.add_argument(r"--user-data-dir=" + self.user_data)
+        options.add_argument("--headless")
+        cached = self.cached_driver_path() is not None
+        for refresh in (False, True) if cached else (False, ):
+            chrome_driver_path = self.chrome_driver_path(refresh=refresh)
+            if chrome_driver_path not in os.environ["PATH"]:
+                os.environ["PATH"] += os.pathsep + chrome_driver_path
+            try:
+                self.driver = webdriver.Chrome(chrome_driver_path, options=options)
+                break
+            except WebDriverException:
+                #* the cached driver may not match an updated Chrome, resolve it once more
+                self.driver = None
+        else:
+            print("\n provide a valid user data folder \n")
+            return False
+        self._feed_tab = None
+        # self.driver.maximize_window()
+        return True
+
+    def acquire(self):
+        """
+        Wait until no other scrape is using the feed tab.
+        """
+        self._session.acquire()
+
+    def release(self):
+        """
+        Let the next scrape use the feed tab.
+        """
+        self._session.release()
+
+    def is_alive(self):
+        """
+        Return ``True`` if the browser still responds.
+        """
+        if self.driver is None:
+            return False
+        try:
+            self.driver.window_handles
+        except WebDriverException:
+            return False
+        return True
+
+    def get_driver(self):
+        """
+        Return a live driver, (re)starting the browser if needed.
+        Return ``None`` if it couldn't be started.
+        """
+        with self._lock:
+            if not self.is_alive():
+                self.quit()
+                if not self.start():
+                    return None
+            return self.driver
+
+    def open_feed(self):
+        """
+        Return a live driver showing a freshly loaded subscriptions feed.
+        The feed tab is reused if it is still open.
+        """
+        with self._lock:
+            for attempt in range(2):
+                driver = self.get_driver()
+                if driver is None:
+                    return None
+                try:
+                    if self._feed_tab in driver.window_handles:
+                        driver.switch_to.window(self._feed_tab)
+                        driver.refresh()
+                    else:
+                        # * create new tab
+                        driver.execute_script("window.open('about:blank','_blank');")
+                        self._feed_tab = driver.window_handles[-1]
+                        driver.switch_to.window(self._feed_tab)
+                        driver.get(FEED_URL)
+                    return driver
+                except WebDriverException:
+                    #* crashed browser, restart once
+                    self.quit()
+            return None
+
+    def quit(self):
+        """
+        Quit the browser gracefully.
+        """
+        with self._lock:
+            if self.driver is not None:
+                try:
+                    self.driver.quit()
+                except WebDriverException:
+                    pass
+            self.driver = None
+            self._feed_tab = None
+
+
+#* shared by every window of the app, a Chrome profile can only be opened once
+driver_service = DriverService()
@@ -0,0 +1,200 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+#* renderer keys holding a single video in the feed and its continuations
+VIDEO_RENDERER_KEYS = ("gridVideoRenderer", "videoRenderer")
+
+#* returns the compact renderer data of every video element from ``arguments[0]`` on.
+#* Elements whose data has not been attached yet are left for the next call.
+NEW_RENDERERS_SCRIPT = """
+const elements = document.querySelectorAll('ytd-grid-video-renderer, ytd-video-renderer');
+const renderers = [];
+let cursor = arguments[0];
+for (; cursor < elements.length; cursor++) {
+    const data = elements[cursor].data;
+    if (!data) break;
+    renderers.push({
+        videoId: data.videoId,
+        title: data.title,
+        publishedTimeText: data.publishedTimeText,
+        shortBylineText: data.shortBylineText,
+        ownerText: data.ownerText,
+        thumbnailOverlays: data.thumbnailOverlays,
+        badges: data.badges,
+        upcomingEventData: data.upcomingEventData,
+        thumbnail: data.thumbnail,
+        channelThumbnail: data.channelThumbnail,
+        channelThumbnailSupportedRenderers: data.channelThumbnailSupportedRenderers,
+    });
+}
+return JSON.stringify({cursor: cursor, renderers: renderers});
+"""
+
+#* renderer count, pending continuation and loaded resources of the feed page
+FEED_STATE_SCRIPT = """
+return {
+    renderers: document.querySelectorAll('ytd-grid-video-renderer, ytd-video-renderer').length,
+    continuation: document.querySelector('ytd-continuation-item-renderer') !== null,
+    resources: performance.getEntriesByType('resource').length,
+};
+"""
+
+_INITIAL_DATA_RE = re.compile(r'(?:var\s+ytInitialData|window\[["\']ytInitialData["\']\])\s*=\s*')
+
+
+class FeedRecord(NamedTuple):
+    """
+    Video information as found in a feed renderer.
+    """
+    video_id: str
+    title: str
+    author: str
+    author_id: str
+    upload_date: str  # relative, e.g. ``3 hours ago``
+    duration: str  # hh:mm:ss format
+    thumbnail: Optional[str] = None
+    style: str = "DEFAULT"  # DEFAULT, LIVE or UPCOMING
+    author_thumbnail: Optional[str] = None  # channel avatar, not in every renderer
+
+
+def extract_initial_data(source: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the ``ytInitialData`` object embedded in a page ``source``, if any.
+    Only the JSON literal is decoded, the rest of the page is never parsed.
+    """
+    match = _INITIAL_DATA_RE.search(source)
+    if match is None:
+        return None
+    try:
+        data, _ = json.JSONDecoder().raw_decode(source, match.end())
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def iter_video_renderers(payload: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Walk a ``ytInitialData`` or continuation ``payload`` and yield every video
+    renderer in document order.
+    """
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key in VIDEO_RENDERER_KEYS:
+                if key in node:
+                    yield node[key]
+                    break
+            else:
+                stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def _text(field: Optional[Dict[str, Any]]) -> str:
+    """
+    Return the plain text of a ``simpleText`` or ``runs`` field.
+    """
+    if not field:
+        return ""
+    if "simpleText" in field:
+        return field["simpleText"]
+    return "".join(run.get("text", "") for run in field.get("runs", []))
+
+
+def _channel_thumbnail(renderer: Dict[str, Any]) -> Optional[str]:
+    """
+    Return the channel avatar url of a ``renderer``, if it has one.
+    """
+    supported = renderer.get("channelThumbnailSupportedRenderers", {})
+    channel_thumbnail = supported.get("channelThumbnailWithLinkRenderer", {}).get("thumbnail") \
+        or renderer.get("channelThumbnail") or {}
+    thumbnails = channel_thumbnail.get("thumbnails", [])
+    if not thumbnails:
+        return None
+    url = thumbnails[-1]["url"]
+    return "https:" + url if url.startswith("//") else url
+
+
+def parse_renderer(renderer: Dict[str, Any]) -> Optional[FeedRecord]:
+    """
+    Return a ``FeedRecord`` from a single video ``renderer``.
+    """
+    video_id = renderer.get("videoId")
+    if not video_id:
+        return None
+
+    byline = renderer.get("shortBylineText") or renderer.get("ownerText") or {}
+    runs = byline.get("runs") or [{}]
+    endpoint = runs[0].get("navigationEndpoint", {})
+    author_id = endpoint.get("browseEndpoint", {}).get("canonicalBaseUrl") \
+        or endpoint.get("commandMetadata", {}).get("webCommandMetadata", {}).get("url", "")
+
+    duration = ""
+    style = "DEFAULT"
+    for overlay in renderer.get("thumbnailOverlays", []):
+        status = overlay.get("thumbnailOverlayTimeStatusRenderer")
+        if status:
+            duration = _text(status.get("text"))
+            style = status.get("style", style)
+            break
+    for badge in renderer.get("badges", []):
+        if badge.get("metadataBadgeRenderer", {}).get("style") == "BADGE_STYLE_TYPE_LIVE_NOW":
+            style = "LIVE"
+    if "upcomingEventData" in renderer:
+        style = "UPCOMING"
+
+    thumbnails = renderer.get("thumbnail", {}).get("thumbnails", [])
+
+    return FeedRecord(
+        video_id=video_id,
+        title=_text(renderer.get("title")),
+        author=_text(byline),
+        author_id=author_id,
+        upload_date=_text(renderer.get("publishedTimeText")),
+        duration=duration,
+        thumbnail=thumbnails[-1]["url"] if thumbnails else None,
+        style=style,
+        author_thumbnail=_channel_thumbnail(renderer),
+    )
+
+
+def parse_feed_records(payload: Any) -> List[FeedRecord]:
+    """
+    Return every ``FeedRecord`` found in ``payload``, without duplicates.
+    """
+    records = []
+    seen = set()
+    for renderer in iter_video_renderers(payload):
+        record = parse_renderer(renderer)
+        if record is None or record.video_id in seen:
+            continue
+        seen.add(record.video_id)
+        records.append(record)
+    return records
+
+
+def records_from_source(source: str) -> List[FeedRecord]:
+    """
+    Return the feed records embedded in a page ``source`` in a single pass.
+    """
+    data = extract_initial_data(source)
+    if data is None:
+        return []
+    return parse_feed_records(data)
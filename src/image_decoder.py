@@ -0,0 +1,88 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QRectF, Qt
+from PyQt5.QtGui import QColor, QImage, QImageReader, QPainter, QPainterPath
+
+#* stands in for a missing bound when only one side is constrained
+_UNBOUNDED = 1 << 16
+
+
+def decode_image(data, width=0, height=0) -> QImage:
+    """
+    Decode encoded image ``data`` straight to the largest size fitting
+    ``width`` x ``height``, keeping its aspect ratio. A bound ``<= 0`` is not
+    enforced. JPEG thumbnails are downscaled while decoding, so the full size
+    image is never materialized.
+    Only uses ``QImage``, so it is safe to call from any thread.
+    """
+    buffer = QBuffer()
+    buffer.setData(QByteArray(bytes(data)))
+    buffer.open(QIODevice.ReadOnly)
+    reader = QImageReader(buffer)
+    source_size = reader.size()
+    if source_size.isValid() and (width > 0 or height > 0):
+        target_size = source_size.scaled(
+            width if width > 0 else _UNBOUNDED,
+            height if height > 0 else _UNBOUNDED,
+            Qt.KeepAspectRatio,
+        )
+        if target_size.width() < source_size.width():
+            reader.setScaledSize(target_size)
+    image = reader.read()
+    buffer.close()
+    return image
+
+
+def round_image(
+    image: QImage,
+    size: int,
+    border_width=0,
+    border_color: Optional[QColor] = None,
+    antialiasing=True,
+) -> QImage:
+    """
+    Return ``image`` clipped to a circle of diameter ``size``, with an optional
+    ``border_width`` ring of ``border_color``.
+    Safe to call from any thread.
+    """
+    pixmap_size = size - border_width * 2
+    source = image.scaled(pixmap_size, pixmap_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    target = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    target.fill(Qt.transparent)
+
+    painter = QPainter(target)
+    if antialiasing:
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setRenderHint(QPainter.HighQualityAntialiasing, True)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+
+    rect = QRectF(0, 0, size, size)
+    if border_width:
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(border_color))
+        painter.drawEllipse(rect)
+        rect.adjust(border_width, border_width, -border_width, -border_width)
+
+    painter_path = QPainterPath()
+    painter_path.addEllipse(rect)
+    painter.setClipPath(painter_path)
+
+    painter.drawImage(border_width, border_width, source)
+    painter.end()  # must be called if there are multiple painters
+    return target
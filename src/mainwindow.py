@@ -19,7 +19,6 @@ import os
 import shutil
 import subprocess
 import sys
-import tempfile
 import threading
 import time
 import traceback
@@ -29,8 +28,9 @@ import qtmodern.styles
 import qtmodern.windows
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import QByteArray, Qt, QUrl
-from PyQt5.QtGui import QColor, QFont, QIcon, QPixmap
-from PyQt5.QtMultimedia import QMediaContent, QMediaPlayer, QMediaPlaylist
+from PyQt5.QtGui import QColor, QFont, QIcon, QImage, QPixmap
+from PyQt5.QtMultimedia import (QMediaContent, QMediaPlayer, QMediaPlaylist,
+                                QMultimedia)
 from PyQt5.QtWidgets import (QApplication, QCheckBox, QComboBox,
                              QGraphicsDropShadowEffect, QGridLayout,
                              QHBoxLayout, QLabel, QLayout, QLineEdit,
@@ -39,15 +39,33 @@ from PyQt5.QtWidgets import (QApplication, QCheckBox, QComboBox,
                              QVBoxLayout, QWidget)
 from PyQt5.sip import delete
 
-from .custom_threading import Worker, WorkerSignals
+from .bandwidth import bandwidth
+from .checkpoint import FeedCheckpoint
+from .custom_threading import (CancellationToken, Cancelled, Worker,
+                               WorkerSignals)
 from .custom_widgets import (CustomDateEdit, CustomFrame, CustomImageButton,
                              CustomListWidget, CustomQWidget, CustomSlider,
                              CustomVerticalFrame, Notification,
                              RoundLabelImage, Spoiler)
+from .downloader import DownloadSession
+from .driver_service import default_user_data, driver_service
+from .image_decoder import decode_image
+from .media_cache import MB, shared_media_cache
+from .metadata import MetadataCache, MetadataFetcher
 from .networking import CustomNetworkManager, Sender
-from .resources import MyIcons, get_path
+from .pipeline import Pipeline, PipelineStopped, Stage
+from .pixmap_cache import pixmap_cache
+from .progress import format_rate, transfer_meter
+from .resources import MyIcons, get_path, get_physical_cpu_count
 from .save_restore import guirestore, guisave
-from .youtube_scraper import Video, YoutubeScraper
+from .scheduler import Prefetcher, PriorityJobQueue, viewport_rows
+from .streaming import AUDIO_MIME_TYPES, StreamServer
+from .youtube_scraper import MyLogger, Video, YoutubeScraper
+
+#* seconds to wait for cancelled jobs on exit
+SHUTDOWN_TIMEOUT = 10
+#* rows above and below the visible ones whose thumbnails are loaded ahead
+THUMBNAIL_MARGIN = 10
 
 #* Attemp to fix chromedriver with noconsole flag
 # TODO show all consoles minimized by default / hidden
@@ -99,7 +117,7 @@ class CustomSignals(QtCore.QObject):
     no_args = QtCore.pyqtSignal()
     sync_icon = QtCore.pyqtSignal(str, bool)
     add_listitem = QtCore.pyqtSignal(Video)
-    start_video_download = QtCore.pyqtSignal(Video)
+    status_message = QtCore.pyqtSignal(str)
 
 
 class NewWindow(QMainWindow):
@@ -147,8 +165,9 @@ class NewWindow(QMainWindow):
         Stop all QRunnables on app exit.
         """
         for window in self.window_list:
-            if len(window.runners) > 0:
-                for runner in window.runners: runner.kill()
+            window.cancel_jobs()
+            window.stream_server.close()
+        driver_service.quit()
 
 class MainWindow(QMainWindow):
     """
@@ -169,7 +188,12 @@ class MainWindow(QMainWindow):
         #* Async download manager
         self.network_manager = CustomNetworkManager()  # only one instance necessary for the whole app
         self.network_manager.downloaded.connect(self.global_client_loader)
-        self.sender_list = []  # prevent gc on sender objects
+        self.network_manager.failed.connect(self.on_request_failed)
+        #* thumbnail requests in flight and loaded, by ``(item_widget, sender_name)``
+        self.thumbnail_requests = {}  # also prevents gc on sender objects
+        self.loaded_thumbnails = set()
+        #* coalesce scroll, resize and insertion events
+        self.thumbnail_timer = QtCore.QTimer(self, singleShot=True, interval=50, timeout=self.load_visible_thumbnails)
 
         #* QGraphicsEffect
         self.widgets_with_hover = []
@@ -188,14 +212,32 @@ class MainWindow(QMainWindow):
 
         self.signal = CustomSignals()
         self.signal.add_listitem.connect(self.fill_list_widget)
-        self.signal.start_video_download.connect(self.video_downloader)
         #* Sync status bar label
         self.signal.sync_icon.connect(self.add_sync_icon)
         self.label_sync = None
-
-        #* Temporary video downloads folder
-        self.temp_dir = tempfile.mkdtemp()
+        self.signal.status_message.connect(lambda message: self.statusBar().showMessage(message))
+        #* aggregate speed of every download
+        self.transfer_rate_label = QLabel()
+        self.statusBar().addPermanentWidget(self.transfer_rate_label)
+        self.transfer_rate_timer = QtCore.QTimer(self)
+        self.transfer_rate_timer.timeout.connect(self.update_transfer_rate)
+        self.transfer_rate_timer.start(1 * 1000)
+
+        #* Warm browser shared by every window and scrape
+        self.driver_service = driver_service
+        #* Newest video seen per browser profile
+        self.checkpoints = FeedCheckpoint()
+        #* Video metadata persisted across sessions
+        self.metadata_cache = MetadataCache()
+        #* a YoutubeDL per download thread, reused for every track
+        self.download_session = DownloadSession({"logger": MyLogger()})
+
+        #* Default video downloads folder, kept across sessions and shared by every window
+        self.media_cache = shared_media_cache()
+        self.temp_dir = str(self.media_cache.directory)
         self.media_download_path = self.temp_dir
+        #* Playback of downloads in progress
+        self.stream_server = StreamServer()
 
         ##############?##############?##############?##############?
         ##############?##############? UI definition
@@ -244,6 +286,15 @@ class MainWindow(QMainWindow):
         #* Thread runner
         self.runners = []
         self.threadpool = QtCore.QThreadPool()
+        #* thumbnails are decoded off the GUI thread, one job per image key
+        self.decode_pool = QtCore.QThreadPool()
+        self.pending_decodes = {}
+        #* metadata -> download stages fed by the scraper
+        self.pipeline = None
+        self.populate_token = None
+        #* tokens of the downloads in progress, by video id
+        self.running_downloads = {}
+        self.running_downloads_lock = threading.Lock()
 
         #* Tray icon
         self.message_is_being_shown = False
@@ -269,6 +320,8 @@ class MainWindow(QMainWindow):
         self.listVideos.customContextMenuRequested.connect(self.on_list_item_right_click)
         self.listVideos.itemClicked.connect(self.on_list_item_left_click)
         self.listVideos.currentItemChanged.connect(self.on_item_change)
+        self.listVideos.verticalScrollBar().valueChanged.connect(lambda: self.thumbnail_timer.start())
+        self.listVideos.verticalScrollBar().rangeChanged.connect(lambda: self.thumbnail_timer.start())
 
 
     def _create_spoiler_section(self,font=None):
@@ -300,6 +353,12 @@ class MainWindow(QMainWindow):
         # TODO add import button
         self.cb_user_temp_folder.toggled.connect(self.media_download_path.setEnabled)
 
+        self.cb_since_checkpoint = QCheckBox("Only scrape videos newer than the checkpoint", objectName="cb_since_checkpoint")
+        self.cb_fast_listing = QCheckBox("Fast listing (fetch full metadata on download)", objectName="cb_fast_listing")
+        self.cb_native_audio = QCheckBox("Keep original audio format (convert only if unplayable)", objectName="cb_native_audio")
+        self.cb_offline_thumbnails = QCheckBox("Prefer cached thumbnails (offline first)", objectName="cb_offline_thumbnails")
+        self.cb_offline_thumbnails.toggled.connect(lambda checked: setattr(self.network_manager, "offline_first", checked))
+
         self.cb_max_video_date = QCheckBox("Set oldest video date to download", objectName="cb_max_video_date")
         self.max_video_date_calendar = CustomDateEdit(
             sizePolicy = sizePolicy,
@@ -333,6 +392,10 @@ class MainWindow(QMainWindow):
         vLayout_1.setAlignment(Qt.AlignTop)
         vLayout_1.addWidget(self.cb_delete_on_exit)
         vLayout_1.addWidget(self.cb_notify_on_download)
+        vLayout_1.addWidget(self.cb_since_checkpoint)
+        vLayout_1.addWidget(self.cb_fast_listing)
+        vLayout_1.addWidget(self.cb_native_audio)
+        vLayout_1.addWidget(self.cb_offline_thumbnails)
         vLayout_1.addLayout(hLayout_1a)
         vLayout_1.addLayout(hLayout_1b)
         vLayout_1.addLayout(hLayout_1c)
@@ -349,9 +412,125 @@ class MainWindow(QMainWindow):
         hLayout_2a.addWidget(self.cb_max_video_duration)
         hLayout_2a.addWidget(self.max_video_duration_spinbox)
 
+        self.metadata_workers_label = QLabel("Concurrent metadata requests", font=font)
+        self.metadata_workers_spinbox = QSpinBox(
+            sizePolicy = sizePolicy,
+            objectName = "metadata_workers_spinbox",
+            minimum    = 1,
+            maximum    = 32,
+            value      = 8,
+            )
+        hLayout_2b=QHBoxLayout()
+        hLayout_2b.addWidget(self.metadata_workers_label)
+        hLayout_2b.addWidget(self.metadata_workers_spinbox)
+
+        self.download_workers_label = QLabel("Concurrent downloads", font=font)
+        self.download_workers_spinbox = QSpinBox(
+            sizePolicy = sizePolicy,
+            objectName = "download_workers_spinbox",
+            minimum    = 1,
+            maximum    = 16,
+            value      = 4,
+            )
+        hLayout_2c=QHBoxLayout()
+        hLayout_2c.addWidget(self.download_workers_label)
+        hLayout_2c.addWidget(self.download_workers_spinbox)
+
+        self.media_cache_size_label = QLabel("Download cache size (MB)", font=font)
+        self.media_cache_size_spinbox = QSpinBox(
+            sizePolicy = sizePolicy,
+            objectName = "media_cache_size_spinbox",
+            minimum    = 100,
+            maximum    = 100000,
+            singleStep = 100,
+            value      = 2048,
+            )
+        self.media_cache_size_spinbox.valueChanged.connect(self.on_media_cache_size_changed)
+        hLayout_2d=QHBoxLayout()
+        hLayout_2d.addWidget(self.media_cache_size_label)
+        hLayout_2d.addWidget(self.media_cache_size_spinbox)
+
+        self.prefetch_label = QLabel("Prefetch next / previous tracks", font=font)
+        self.prefetch_ahead_spinbox = QSpinBox(
+            sizePolicy = sizePolicy,
+            objectName = "prefetch_ahead_spinbox",
+            minimum    = 0,
+            maximum    = 20,
+            value      = 3,
+            )
+        self.prefetch_behind_spinbox = QSpinBox(
+            sizePolicy = sizePolicy,
+            objectName = "prefetch_behind_spinbox",
+            minimum    = 0,
+            maximum    = 20,
+            value      = 1,
+            )
+        hLayout_2e=QHBoxLayout()
+        hLayout_2e.addWidget(self.prefetch_label)
+        hLayout_2e.addWidget(self.prefetch_ahead_spinbox)
+        hLayout_2e.addWidget(self.prefetch_behind_spinbox)
+
+        self.bandwidth_label = QLabel("Download limit (KB/s, 0 = none) / % kept for thumbnails", font=font)
+        self.bandwidth_limit_spinbox = QSpinBox(
+            sizePolicy = sizePolicy,
+            objectName = "bandwidth_limit_spinbox",
+            minimum    = 0,
+            maximum    = 1000000,
+            singleStep = 100,
+            value      = 0,
+            )
+        self.bandwidth_share_spinbox = QSpinBox(
+            sizePolicy = sizePolicy,
+            objectName = "bandwidth_share_spinbox",
+            minimum    = 5,
+            maximum    = 90,
+            value      = 20,
+            )
+        self.bandwidth_limit_spinbox.valueChanged.connect(self.on_bandwidth_changed)
+        self.bandwidth_share_spinbox.valueChanged.connect(self.on_bandwidth_changed)
+        hLayout_2f=QHBoxLayout()
+        hLayout_2f.addWidget(self.bandwidth_label)
+        hLayout_2f.addWidget(self.bandwidth_limit_spinbox)
+        hLayout_2f.addWidget(self.bandwidth_share_spinbox)
+
+        self.http_cache_size_label = QLabel("Thumbnail cache size (MB)", font=font)
+        self.http_cache_size_spinbox = QSpinBox(
+            sizePolicy = sizePolicy,
+            objectName = "http_cache_size_spinbox",
+            minimum    = 10,
+            maximum    = 10000,
+            singleStep = 10,
+            value      = 100,
+            )
+        self.http_cache_size_spinbox.valueChanged.connect(lambda size_mb: setattr(self.network_manager, "cache_size", size_mb * MB))
+        hLayout_2g=QHBoxLayout()
+        hLayout_2g.addWidget(self.http_cache_size_label)
+        hLayout_2g.addWidget(self.http_cache_size_spinbox)
+
+        self.pixmap_cache_size_label = QLabel("Image memory cache (MB)", font=font)
+        self.pixmap_cache_size_spinbox = QSpinBox(
+            sizePolicy = sizePolicy,
+            objectName = "pixmap_cache_size_spinbox",
+            minimum    = 8,
+            maximum    = 2048,
+            singleStep = 8,
+            value      = 64,
+            )
+        self.pixmap_cache_size_spinbox.valueChanged.connect(lambda size_mb: setattr(pixmap_cache, "max_size", size_mb * MB))
+        hLayout_2h=QHBoxLayout()
+        hLayout_2h.addWidget(self.pixmap_cache_size_label)
+        hLayout_2h.addWidget(self.pixmap_cache_size_spinbox)
+
         vLayout_2 = QVBoxLayout()
         vLayout_2.setAlignment(Qt.AlignTop)
         vLayout_2.addLayout(hLayout_2a)
+        vLayout_2.addLayout(hLayout_2b)
+        vLayout_2.addLayout(hLayout_2c)
+        vLayout_2.addLayout(hLayout_2d)
+        vLayout_2.addLayout(hLayout_2e)
+        vLayout_2.addLayout(hLayout_2f)
+        vLayout_2.addLayout(hLayout_2g)
+        vLayout_2.addLayout(hLayout_2h)
 
         main_layout = QHBoxLayout()
         main_layout.setAlignment(Qt.AlignTop)
@@ -385,6 +564,12 @@ class MainWindow(QMainWindow):
         # TODO small volume slider in toolbar right aligned
         # self.player.volumeChanged.connect()
         self.player.setVolume(60)
+        #* checked once, the backend doesn't change while running
+        self.native_audio_formats = [
+            ext for ext, mime_type in AUDIO_MIME_TYPES.items()
+            if QMediaPlayer.hasSupport(mime_type) >= QMultimedia.ProbablySupported
+        ]
+        print(f"Natively playable audio formats: {self.native_audio_formats}")
 
     def _restore_settings_on_start(self):
         """
@@ -600,35 +785,73 @@ class MainWindow(QMainWindow):
         Starts a worker by its arbitrary name.
         """
         if worker == "populate_worker":
+            #* one scrape at a time, enabled again once it is listed
+            self.actionGetFeed.setEnabled(False)
+            self.cancel_thumbnail_requests()
+            #* downloads of the previous feed
+            if self.populate_token is not None:
+                self.populate_token.cancel()
+            if self.pipeline is not None:
+                self.pipeline.stop()
             populate_worker = Worker(self.populate_video_list)
+            self.populate_token = populate_worker.cancel_token
+            self.pipeline = None
             populate_worker.signals.error.connect(self.on_scraper_error)
             populate_worker.signals.finished.connect(self.on_scraper_finish)
+            populate_worker.signals.error.connect(lambda error: self.actionGetFeed.setEnabled(True))
+            self.runners.append(populate_worker)
             self.threadpool.start(populate_worker)
-        elif worker == "video_download":
-            video = kwargs.pop('video')
-            if isinstance(video, Video):
-                # TODO fix duration not scraped correctly.
-                # wait until info_dict is downloaded and compare then
-                if video.duration == 0:
-                    #? ignores unreleased videos (premiere, etc)
-                    pass
-                elif video.duration < self.max_video_duration:
-                    media_download_path = self.get_media_download_path()
-                    yt_dl_worker = Worker(video.start_download, media_download_path)
-                    self.threadpool.start(yt_dl_worker)
-                #TODO if not self.is_downloaded -> gray out
 
     def on_scraper_finish(self):
         """
         To be invoked when the scraping process finishes successfully.
         """
-        #* Download thumbnail
-        for row in range(0, self.listVideos.count()):
+        self.actionGetFeed.setEnabled(True)
+        self.load_visible_thumbnails()
+
+    def load_visible_thumbnails(self):
+        """
+        Requests the thumbnails and avatars of the visible rows first, then of
+        ``THUMBNAIL_MARGIN`` rows around them. Requests for rows scrolled out of
+        that range are aborted, to be made again once they are in range.
+        """
+        count = self.listVideos.count()
+        viewport = self.listVideos.viewport().rect()
+        first = self.listVideos.indexAt(viewport.topLeft()).row()
+        last = self.listVideos.indexAt(viewport.bottomLeft()).row()
+        rows = viewport_rows(first, last if last >= 0 else count - 1, count, THUMBNAIL_MARGIN)
+
+        in_range = set()
+        for row in rows:
             item_widget = self.listVideos.itemWidget(self.listVideos.item(row))
+            if not hasattr(item_widget, "video"): continue
             video = item_widget.video
-            vid_thumbnail_sender = Sender("vid_thumbnail", item_widget)
-            self.sender_list.append(vid_thumbnail_sender)
-            self.network_manager.start_download(url=video.thumbnail, sender=vid_thumbnail_sender)
+            for sender_name, url in (("vid_thumbnail", video.thumbnail), ("author_thumbnail", video.author_thumbnail)):
+                request_key = (item_widget, sender_name)
+                if url is None or request_key in self.loaded_thumbnails: continue
+                in_range.add(request_key)
+                if request_key in self.thumbnail_requests: continue
+                pixmap = pixmap_cache.get(self.thumbnail_key(sender_name, item_widget, url))
+                if pixmap is not None:
+                    #* re-populated list, nothing to download or decode
+                    self.show_thumbnail(sender_name, item_widget, pixmap)
+                    self.loaded_thumbnails.add(request_key)
+                    continue
+                sender = self.thumbnail_requests[request_key] = Sender(sender_name, item_widget)
+                self.network_manager.start_download(url=url, sender=sender)
+
+        for request_key in list(self.thumbnail_requests):
+            if request_key not in in_range:
+                self.network_manager.abort(self.thumbnail_requests.pop(request_key))
+
+    def cancel_thumbnail_requests(self):
+        """
+        Aborts every thumbnail request, e.g. before the list is repopulated.
+        """
+        for sender in self.thumbnail_requests.values():
+            self.network_manager.abort(sender)
+        self.thumbnail_requests = {}
+        self.loaded_thumbnails = set()
 
     def on_scraper_error(self, error):
         exctype, value, traceback = error
@@ -641,19 +864,16 @@ class MainWindow(QMainWindow):
         )
 
 
-    def video_downloader(self, video: Video):
-        """
-        Starts a parallel execution to download the given ``Video`` instance.
-        """
-        self.start_worker("video_download", video=video)
-
-    def populate_video_list(self):
+    def populate_video_list(self, cancel_token: CancellationToken = None):
         """
         Triggers the main scraping workflow.
+        ``cancel_token`` : stops scraping and every download of this feed.
+        The scraper and pipeline of a run are local to it, ``self.pipeline`` and
+        ``self.populate_token`` only expose the latest run to the GUI.
         """
+        cancel_token = cancel_token or CancellationToken()
         try:
             self.listVideos.clear()
-            self.scraper.stop_scraping()
             self.signal.sync_icon.emit("", True)
         except:
             pass
@@ -665,34 +885,172 @@ class MainWindow(QMainWindow):
         max_date = self.max_video_date if self.cb_max_video_date.isChecked() else now
         max_videos = self.max_video_number_spinbox.value() if self.cb_max_video_number.isChecked() else 300
         print(f"\nDate is now limited to: {max_date}\n")
-        self.scraper = YoutubeScraper(max_videos, max_date)
+        checkpoint = self.checkpoints.get(self.browser_profile) if self.cb_since_checkpoint.isChecked() else None
+        scraper = YoutubeScraper(
+            max_videos,
+            max_date,
+            last_video_id=checkpoint["video_id"] if checkpoint else None,
+            last_video_time=checkpoint["time"] if checkpoint else None,
+            driver_service=self.driver_service,
+            cancel_token=cancel_token,
+        )
         
         # TODO get chrome data folder from a qlineedit
-        # self.scraper.user_data = ???.text()
-        
-        self.my_videos = self.scraper.get_videos_from_feed()
+        # scraper.user_data = ???.text()
 
+        self.fast_listing = self.cb_fast_listing.isChecked()
+        self.download_dir = self.get_media_download_path()
+        self.download_cache = self.get_media_cache()
+        self.download_formats = self.native_audio_formats if self.cb_native_audio.isChecked() else None
+        metadata_fetcher = MetadataFetcher(cache=self.metadata_cache, cancel_token=cancel_token)
         delete_later = []
-        for id, video in self.my_videos.items():
-            #* extremely slow youtube-dl function. 
-            try:
-                self.my_videos[id].download_video_metadata()
-            except:
-                #* ignore Premieres, etc
-                delete_later.append(id)
-                continue
-            
-            # TODO process videos here, not in scraper module
-            self.signal.add_listitem.emit(video)
-            self.signal.start_video_download.emit(video)
-            QApplication.processEvents()  # QRunnable not worth it
-            
+        pipeline = Pipeline(
+            [
+                Stage(
+                    "metadata",
+                    lambda video: self.metadata_stage(video, metadata_fetcher, cancel_token),
+                    workers=self.metadata_workers_spinbox.value(),
+                    queue_factory=PriorityJobQueue,
+                ),
+                #* unbounded: listing never waits for downloads, and every
+                #* pending download can be moved to the front
+                Stage(
+                    "download",
+                    lambda video: self.download_stage(video, cancel_token, pipeline),
+                    workers=self.download_workers_spinbox.value(),
+                    queue_size=0,
+                    queue_factory=PriorityJobQueue,
+                ),
+                #* ffmpeg is CPU bound, one process per physical core
+                Stage(
+                    "convert",
+                    lambda video: self.convert_stage(video, cancel_token),
+                    workers=get_physical_cpu_count(),
+                    queue_size=0,
+                    queue_factory=PriorityJobQueue,
+                ),
+            ],
+            on_error=lambda stage, video, error: self.on_pipeline_error(stage, video, error, delete_later),
+        ).start()
+        self.pipeline = pipeline
+
+        #* list items are added and downloads started while scrolling continues
+        try:
+            for video in scraper.iter_videos_from_feed():
+                if video.is_live or video.is_upcoming:
+                    #* ignore Premieres and livestreams
+                    delete_later.append(video.id)
+                    continue
+                pipeline.put(video)
+        except (Cancelled, PipelineStopped):
+            pipeline.stop()
+            raise Cancelled()
+        pipeline.close()
+        pipeline.join(stage="metadata")
+        cancel_token.raise_if_cancelled()
+
+        my_videos = scraper.my_videos
+        #* livestreams and premieres are listed first, but may never be uploaded
+        newest_video = next(
+            (video for video in my_videos.values() if not video.is_live and not video.is_upcoming), None
+        )
+        if newest_video is not None and self.cb_since_checkpoint.isChecked():
+            self.checkpoints.set(self.browser_profile, newest_video.id, newest_video.time)
 
         for id in delete_later:
-            del self.my_videos[id]
+            my_videos.pop(id, None)
             
         self.signal.sync_icon.emit("", True)
+        if not self.fast_listing:
+            self.signal.status_message.emit(self.metadata_cache.stats())
+        print(f"\nPipeline:\n{pipeline.summary()}\n")
 
+    def cancel_jobs(self, timeout=SHUTDOWN_TIMEOUT):
+        """
+        Cancel scraping, downloads and conversions, waiting up to ``timeout``
+        seconds for them to stop and clean up their partial files.
+        """
+        deadline = time.monotonic() + timeout
+        for runner in self.runners: runner.kill()
+        self.runners = []
+        if self.populate_token is not None:
+            self.populate_token.cancel()
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            self.pipeline.join(timeout)
+        self.cancel_thumbnail_requests()
+        self.decode_pool.clear()
+        self.threadpool.waitForDone(max(0, int((deadline - time.monotonic()) * 1000)))
+        self.decode_pool.waitForDone(max(0, int((deadline - time.monotonic()) * 1000)))
+
+    def on_pipeline_error(self, stage: Stage, video: Video, error: BaseException, delete_later: list):
+        """
+        Pipeline error handler: videos without metadata, e.g. premieres, are
+        unlisted later on. Failed downloads and conversions are marked as such.
+        """
+        if stage.name == "metadata":
+            delete_later.append(video.id)
+            return
+        if isinstance(error, Cancelled):
+            return
+        print(f"\n{stage.name.capitalize()} of {video.title} failed: {error!r}\n")
+        video.set_download_state("download_fail")
+
+    def metadata_stage(self, video: Video, metadata_fetcher: MetadataFetcher, cancel_token: CancellationToken):
+        """
+        Pipeline stage: completes ``video`` metadata and lists it.
+        """
+        if not self.fast_listing and not self.metadata_cache.fill(video):
+            #* extremely slow youtube-dl request
+            metadata_fetcher.fetch_one(video)
+        #* the list may have been cleared for another run meanwhile
+        cancel_token.raise_if_cancelled()
+        self.signal.add_listitem.emit(video)
+        return video
+
+    def download_stage(self, video: Video, run_token: CancellationToken, pipeline: Pipeline):
+        """
+        Pipeline stage: downloads ``video`` unless it exceeds the maximum duration.
+        Videos still to be converted are passed on to the conversion stage.
+        """
+        # TODO fix duration not scraped correctly.
+        # wait until info_dict is downloaded and compare then
+        if video.duration == 0 or video.duration >= self.max_video_duration:
+            #? ignores unreleased videos (premiere, etc)
+            return None
+        cancel_token = run_token.child()
+        with self.running_downloads_lock:
+            self.running_downloads[video.id] = cancel_token
+        try:
+            video.start_download(
+                self.download_dir,
+                native_formats=self.download_formats,
+                convert_later=True,
+                media_cache=self.download_cache,
+                cancel_token=cancel_token,
+                session=self.download_session,
+            )
+        finally:
+            with self.running_downloads_lock:
+                if self.running_downloads.get(video.id) is cancel_token:
+                    del self.running_downloads[video.id]
+            run_token.release_child(cancel_token)
+        if cancel_token.preempted and not run_token.is_cancelled:
+            #* out of the prefetch window after a jump, resumed when its turn comes
+            pipeline["download"].queue.put(video)
+            return None
+        #TODO if not self.is_downloaded -> gray out
+        return video if video.needs_conversion else None
+
+    def convert_stage(self, video: Video, run_token: CancellationToken):
+        """
+        Pipeline stage: converts ``video`` to mp3, until the run is cancelled.
+        """
+        cancel_token = run_token.child()
+        try:
+            video.convert_to_mp3(cancel_token=cancel_token)
+        finally:
+            run_token.release_child(cancel_token)
 
     def fill_list_widget(self, video: Video):
         """
@@ -740,6 +1098,7 @@ class MainWindow(QMainWindow):
             icon_max_size = 30,
         )
         self.apply_effect_on_hover(checkpoint_button)
+        checkpoint_button.clicked.connect(lambda: self.set_checkpoint(video))
         frameLayout.addWidget(checkpoint_button)
 
         item_widget.frame.setLayout(frameLayout)
@@ -750,20 +1109,44 @@ class MainWindow(QMainWindow):
         media_download_path = self.get_media_download_path()
         item_widget.media_path = os.path.join(media_download_path)
         item_widget.video.download_button = download_button
+        if video.download_state is not None:
+            download_button.icon = video.download_state
+        video.progress_signals = WorkerSignals()
+        video.progress_signals.progress.connect(item_widget.setProgress)
         # item_widget.frame.layout().itemAt() #! incomprehensible later on
 
         item_widget.setTextUp(video.title)
 
-        # author_thumbnail_sender = Sender("author_thumbnail", item_widget)
-        # it's not garbage. Else the reply will return a destroyed Sender
-        # self.sender_list.append(author_thumbnail_sender)
-        # self.network_manager.start_download(url=video.author_thumbnail, sender=author_thumbnail_sender)
-        
+        #* thumbnail and avatar requests are made by ``load_visible_thumbnails``
+
         # no need to subclass QListWidgetItem, just the widget (CustomQWidget) set on it
         item = QListWidgetItem(self.listVideos)
         item.setSizeHint(item_widget.sizeHint())
         self.listVideos.addItem(item)
         self.listVideos.setItemWidget(item, item_widget)
+        self.thumbnail_timer.start()
+
+    @property
+    def browser_profile(self):
+        """
+        Browser user data folder the feed is scraped with.
+        """
+        return self.driver_service.user_data or default_user_data()
+
+    def update_transfer_rate(self):
+        """
+        Shows the current download speed in the status bar.
+        """
+        rate = transfer_meter.rate()
+        self.transfer_rate_label.setText(f"↓ {format_rate(rate)}" if rate > 0 else "")
+        self.transfer_rate_label.setToolTip(f"{self.network_manager.stats()}\n{pixmap_cache.stats()}")
+
+    def set_checkpoint(self, video: Video):
+        """
+        Marks ``video`` as the newest one already seen in the feed.
+        """
+        self.checkpoints.set(self.browser_profile, video.id, video.time)
+        self.statusBar().showMessage(f"Checkpoint set to: {video.title}")
 
     def get_media_download_path(self):
         """
@@ -775,6 +1158,27 @@ class MainWindow(QMainWindow):
             media_download_path = self.media_download_path.text()
         return media_download_path
 
+    def get_media_cache(self):
+        """
+        Return the media cache, unless downloads go to a user-defined folder.
+        """
+        return None if self.cb_user_temp_folder.isChecked() else self.media_cache
+
+    def on_media_cache_size_changed(self, size_mb: int):
+        """
+        Apply the media cache size limit, evicting files if needed.
+        """
+        self.media_cache.max_size = size_mb * MB
+
+    def on_bandwidth_changed(self):
+        """
+        Apply the bandwidth limit and the share reserved for thumbnails.
+        """
+        bandwidth.configure(
+            total_rate=self.bandwidth_limit_spinbox.value() * 1024,
+            interactive_share=self.bandwidth_share_spinbox.value() / 100,
+        )
+
     # TODO this begs refactoring / reimplement mousePressEvent 
     def on_list_item_left_click(self, item: QListWidgetItem):
         """
@@ -817,6 +1221,7 @@ class MainWindow(QMainWindow):
         """
         current_item = item
         current_widget = self.listVideos.itemWidget(current_item)
+        self.prioritize_downloads()
         self.is_playing = self.playButton.isChecked()
         if self.is_playing:
             if not hasattr(current_widget, "video"):
@@ -826,8 +1231,8 @@ class MainWindow(QMainWindow):
                 # item and previous_item row number
                 return
             current_video = current_widget.video
-            if current_video.download_path is None: return
-            video_media = QMediaContent(QUrl.fromLocalFile(current_video.download_path))
+            video_media = self.get_media_content(current_video)
+            if video_media is None: return
             self.playlist.clear()
             self.playlist.addMedia(video_media)
             self.player.play()
@@ -882,16 +1287,16 @@ class MainWindow(QMainWindow):
         print("current_video.download_path : ", current_video.download_path)
         if self.player.mediaStatus() == QMediaPlayer.NoMedia:
             self.played_video = current_video
-            if current_video.download_path is None: return
-            # print("current_video.download_path : ", current_video.download_path)
-            video_media = QMediaContent(QUrl.fromLocalFile(current_video.download_path))
+            video_media = self.get_media_content(current_video)
+            if video_media is None: return
             self.playlist.addMedia(video_media)
             if self.playlist.mediaCount() != 0:
                 self.player.setPlaylist(self.playlist)
         else:
             if self.played_video != current_video:
+                video_media = self.get_media_content(current_video)
+                if video_media is None: return
                 self.playlist.clear()
-                video_media = QMediaContent(QUrl.fromLocalFile(current_video.download_path))
                 self.playlist.addMedia(video_media)
                 self.played_video = current_video
 
@@ -901,6 +1306,19 @@ class MainWindow(QMainWindow):
         elif not self.was_paused:
             self.player.pause()
 
+    def get_media_content(self, video: Video):
+        """
+        Return the finished download of ``video`` or, if enough of a playable
+        format has been downloaded, a stream of the download in progress.
+        """
+        if video.download_path is not None:
+            self.stream_server.release()  # the streamed download may be removed
+            return QMediaContent(QUrl.fromLocalFile(video.download_path))
+        if self.stream_server.is_ready(video) and \
+                video.stream_filename.rsplit(".", 1)[-1] in self.native_audio_formats:
+            return QMediaContent(QUrl(self.stream_server.url(video)))
+        return None
+
     def on_previous_song(self):
         """
         Select the previous video list item.
@@ -911,7 +1329,7 @@ class MainWindow(QMainWindow):
         if self.listVideos.currentRow() == 0:
             previous_row = self.listVideos.count() - 1
 
-        self.listVideos.setCurrentRow(previous_row)
+        self.listVideos.setCurrentRow(previous_row)  # prioritizes downloads through on_item_change
         self.on_list_item_left_click(self.listVideos.item(previous_row))
 
     def on_next_song(self):
@@ -924,9 +1342,30 @@ class MainWindow(QMainWindow):
         if self.listVideos.currentRow() == self.listVideos.count() - 1:
             next_row = 0
 
-        self.listVideos.setCurrentRow(next_row)
+        self.listVideos.setCurrentRow(next_row)  # prioritizes downloads through on_item_change
         self.on_list_item_left_click(self.listVideos.item(next_row))
 
+    def prioritize_downloads(self):
+        """
+        Move the selected video and the ones around it to the front of the pending
+        downloads. Downloads running outside of them are paused if they would
+        otherwise wait for a free worker.
+        """
+        if self.pipeline is None or self.listVideos.count() == 0: return
+        video_ids = []
+        for row in range(self.listVideos.count()):
+            widget = self.listVideos.itemWidget(self.listVideos.item(row))
+            video_ids.append(widget.video.id if hasattr(widget, "video") else None)
+        prefetcher = Prefetcher(
+            (stage.queue for stage in self.pipeline.stages),
+            ahead=self.prefetch_ahead_spinbox.value(),
+            behind=self.prefetch_behind_spinbox.value(),
+        )
+        prefetcher.update(self.listVideos.currentRow(), video_ids)
+        with self.running_downloads_lock:
+            running_downloads = dict(self.running_downloads)
+        prefetcher.preempt(self.listVideos.currentRow(), video_ids, self.pipeline["download"].queue, running_downloads)
+
     def apply_shadow_effect(self, widget: QWidget, color=QColor(50, 50, 50), blur_radius=10, offset=2):
         """
         Same widget graphic effect instance can't be used more than once
@@ -1193,13 +1632,84 @@ class MainWindow(QMainWindow):
         """
         Handles requests made from a custom ``QNetworkAccessManager``.
         """
-        if sender.sender_name == "vid_thumbnail":
-            vid_thumbnail = QPixmap()
-            vid_thumbnail.loadFromData(byte_array)
-            sender.sender_object.set_thumbnail(vid_thumbnail)
+        if sender.sender_name in ("vid_thumbnail", "author_thumbnail"):
+            item_widget = sender.sender_object
+            request_key = (item_widget, sender.sender_name)
+            if self.thumbnail_requests.get(request_key) is not sender: return  # list repopulated
+            del self.thumbnail_requests[request_key]
+            self.loaded_thumbnails.add(request_key)
+
+            key = self.thumbnail_key(sender.sender_name, item_widget, sender.url)
+            pixmap = pixmap_cache.get(key)
+            if pixmap is not None:
+                self.show_thumbnail(sender.sender_name, item_widget, pixmap)
+            elif sender.sender_name == "author_thumbnail":
+                self.start_decode(
+                    key, lambda pixmap: self.show_thumbnail("author_thumbnail", item_widget, pixmap),
+                    item_widget.authorQLabel.decode_round_image, bytes(byte_array)
+                )
+            else:
+                self.start_decode(
+                    key, lambda pixmap: self.show_thumbnail("vid_thumbnail", item_widget, pixmap),
+                    decode_image, bytes(byte_array), *item_widget.thumbnail_size()
+                )
+
+    def on_request_failed(self, sender: Sender):
+        """
+        Forgets a failed thumbnail request, made again by the next ``load_visible_thumbnails``.
+        """
+        request_key = (sender.sender_object, sender.sender_name)
+        if self.thumbnail_requests.get(request_key) is sender:
+            del self.thumbnail_requests[request_key]
+
+    def thumbnail_key(self, sender_name: str, item_widget: CustomQWidget, url: str):
+        """
+        Returns the ``pixmap_cache`` key of a thumbnail or avatar as shown by ``item_widget``.
+        """
+        if sender_name == "author_thumbnail":
+            #* many videos share the same channel
+            return item_widget.authorQLabel.cache_key(url)
+        return (url, *item_widget.thumbnail_size(), "thumbnail")
 
-        if sender.sender_name == "author_thumbnail":
-            sender.sender_object.authorQLabel.set_round_label(byte_array)
+    def show_thumbnail(self, sender_name: str, item_widget: CustomQWidget, pixmap: QPixmap):
+        """
+        Shows a decoded thumbnail or avatar in ``item_widget``.
+        """
+        if sender_name == "author_thumbnail":
+            item_widget.authorQLabel.set_round_label(pixmap=pixmap)
+        else:
+            item_widget.set_thumbnail(pixmap, scaled=True)
+
+    def start_decode(self, key, on_decoded, fn, *args):
+        """
+        Runs ``fn(*args)``, returning a ``QImage``, in ``decode_pool``.
+        The image is converted to a ``QPixmap`` in the GUI thread, stored in
+        ``pixmap_cache`` under ``key`` and passed to ``on_decoded``.
+        Requests for a ``key`` already being decoded wait for that job.
+        """
+        if key in self.pending_decodes:
+            self.pending_decodes[key][1].append(on_decoded)
+            return
+        decode_worker = Worker(fn, *args)
+        #* the worker is kept alive until its result is delivered
+        self.pending_decodes[key] = (decode_worker, [on_decoded])
+        decode_worker.signals.result.connect(lambda image: self.on_image_decoded(key, image))
+        decode_worker.signals.error.connect(lambda error: self.pending_decodes.pop(key, None))
+        self.decode_pool.start(decode_worker)
+
+    def on_image_decoded(self, key, image: QImage):
+        """
+        Caches a decoded image as a pixmap and passes it to every ``start_decode`` waiting for ``key``.
+        """
+        _, callbacks = self.pending_decodes.pop(key, (None, []))
+        if image.isNull():
+            return
+        pixmap = pixmap_cache.put(key, QPixmap.fromImage(image))
+        for on_decoded in callbacks:
+            try:
+                on_decoded(pixmap)
+            except RuntimeError:
+                pass  #* widget deleted while decoding, e.g. the list was repopulated
 
     def single_timer(self, seconds, fn, *args, **kwargs):
         """
@@ -1320,15 +1830,18 @@ class MainWindow(QMainWindow):
         if close.clickedButton() == close_accept:
             self.showMinimized()
             self.trayIcon.setVisible(False)
+            self.cancel_jobs()
 
             #* Delete temp folder
             media_download_path = self.get_media_download_path()
-            if self.cb_delete_on_exit.isChecked():
+            if self.cb_delete_on_exit.isChecked() and self.get_media_cache() is not None:
+                self.media_cache.clear()
+            elif self.cb_delete_on_exit.isChecked():
                 shutil.rmtree(media_download_path, ignore_errors=True)
             guisave(self, self.my_settings, self.objects_to_exclude)
             try:
                 self.player.pause()
-                self.scraper.stop_scraping()
+                self.stream_server.close()
             except:
                 pass
             event.accept()
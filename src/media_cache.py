@@ -0,0 +1,225 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .resources import get_cache_dir
+
+MB = 1024 * 1024
+#* unindexed files younger than this may still be downloading in another window
+_ORPHAN_AGE = 3600
+_INDEX_NAME = "index.json"
+
+
+class MediaCache:
+    """
+    Downloaded media files kept across sessions, keyed by video id and format.
+    A JSON index stores the size and last access of every complete file.
+    Least recently used files are deleted once ``max_size`` bytes are exceeded.
+    Files that are missing, truncated or left over from interrupted downloads are
+    dropped when the cache is opened. Usage:
+    ------::
+
+        cache = MediaCache(max_size=2048 * MB)
+        path = cache.lookup(video.id, ["m4a", "mp3"])
+        if path is None:
+            ... # download to cache.directory
+            cache.add(video.id, downloaded_path)
+    """
+
+    def __init__(self, directory=None, max_size=2048 * MB):
+        self.directory = Path(directory or get_cache_dir("media"))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.directory / _INDEX_NAME
+        self._max_size = int(max_size)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._index = self._load()
+        self._check_integrity()
+
+    @staticmethod
+    def key(video_id: str, media_format: str) -> str:
+        """
+        Return the index key, also the file name, of ``video_id`` in ``media_format``.
+        """
+        return f"{video_id}.{media_format}"
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size: int):
+        with self._lock:
+            self._max_size = int(max_size)
+            self._evict()
+            self._save()
+
+    def total_size(self) -> int:
+        """
+        Return the bytes taken by indexed files.
+        """
+        with self._lock:
+            return sum(entry["size"] for entry in self._index.values())
+
+    def lookup(self, video_id: str, formats: Iterable[str]) -> Optional[str]:
+        """
+        Return the path of the first cached file of ``video_id`` in ``formats``.
+        """
+        with self._lock:
+            for media_format in formats:
+                key = self.key(video_id, media_format)
+                entry = self._index.get(key)
+                if entry is None:
+                    continue
+                if not self._is_intact(key, entry):
+                    del self._index[key]
+                    self._save()
+                    continue
+                entry["accessed_at"] = time.time()
+                self._save()
+                self.hits += 1
+                return str(self.directory / key)
+            self.misses += 1
+            return None
+
+    def add(self, video_id: str, path: str):
+        """
+        Index the complete file at ``path``, which must be inside ``directory``.
+        Its extension is the format.
+        """
+        path = Path(path)
+        media_format = path.suffix.lstrip(".")
+        key = self.key(video_id, media_format)
+        if path.name != key:
+            os.replace(path, self.directory / key)
+        with self._lock:
+            self._index[key] = {
+                "size": (self.directory / key).stat().st_size,
+                "accessed_at": time.time(),
+            }
+            self._evict(keep=key)
+            self._save()
+        return str(self.directory / key)
+
+    def clear(self):
+        """
+        Delete every cached file, along with the ``.part`` and ``.ytdl`` files
+        left over from interrupted downloads.
+        """
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+            for path in self.directory.iterdir():
+                if path.name in (_INDEX_NAME, self._index_path.with_suffix(".tmp").name):
+                    continue
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._save()
+
+    def stats(self) -> str:
+        """
+        Return hits, misses and size for display.
+        """
+        return (
+            f"Media cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.total_size() / MB:.0f}/{self.max_size / MB:.0f} MB"
+        )
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self._index_path, "r", encoding="utf8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = self._index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _is_intact(self, key: str, entry: dict) -> bool:
+        try:
+            return (self.directory / key).stat().st_size == entry["size"]
+        except OSError:
+            return False
+
+    def _check_integrity(self):
+        """
+        Drop missing or truncated entries and delete old unindexed files,
+        e.g. ``.part`` files of interrupted downloads.
+        """
+        with self._lock:
+            for key, entry in list(self._index.items()):
+                if not self._is_intact(key, entry):
+                    self._remove(key)
+            now = time.time()
+            for path in self.directory.iterdir():
+                if path.name in self._index or path.name in (_INDEX_NAME, self._index_path.with_suffix(".tmp").name):
+                    continue
+                try:
+                    if now - path.stat().st_mtime > _ORPHAN_AGE:
+                        path.unlink()
+                except OSError:
+                    pass
+            self._evict()
+            self._save()
+
+    def _evict(self, keep: Optional[str] = None):
+        total_size = sum(entry["size"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda key: self._index[key]["accessed_at"]):
+            if total_size <= self._max_size:
+                break
+            if key == keep:
+                continue
+            size = self._index[key]["size"]
+            if self._remove(key):
+                total_size -= size
+
+    def _remove(self, key: str) -> bool:
+        try:
+            (self.directory / key).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False  # e.g. being played on Windows, retried on next eviction
+        del self._index[key]
+        return True
+
+
+_shared_cache: Optional[MediaCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_media_cache() -> MediaCache:
+    """
+    Return the cache shared by every window of the app, opened on first use.
+    Windows with their own ``MediaCache`` on the same directory would overwrite
+    each other's index.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = MediaCache()
+        return _shared_cache
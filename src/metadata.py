@@ -0,0 +1,183 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from youtube_dl import YoutubeDL
+
+from .custom_threading import CancellationToken
+from .resources import get_cache_dir
+from .youtube_scraper import MyLogger, Video
+
+DAY = 24 * 3600
+
+#* seconds a cached field is trusted for
+DEFAULT_TTLS = {
+    "thumbnail": 30 * DAY,
+    "duration": 365 * DAY,
+    "title": 7 * DAY,
+    "author": 30 * DAY,
+    "upload_time": 365 * DAY,
+}
+
+
+class MetadataCache:
+    """
+    Persistent ``Video`` metadata keyed by video id, stored in SQLite.
+    Each field expires after its own TTL. The least recently used entries are
+    evicted once ``max_entries`` is exceeded.
+    """
+
+    FIELDS = tuple(DEFAULT_TTLS)
+
+    def __init__(self, path=None, max_entries=5000, ttls: Optional[Dict[str, int]] = None):
+        self._path = str(path or Path(get_cache_dir(), "metadata.sqlite3"))
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self._path, check_same_thread=False)
+        columns = ", ".join(f"{field}, {field}_at REAL" for field in self.FIELDS)
+        columns_found = {row[1] for row in self._connection.execute("PRAGMA table_info(videos)")}
+        with self._connection:
+            if columns_found and not set(self.FIELDS) <= columns_found:
+                #* older schema, e.g. relative time estimates stored as upload times
+                self._connection.execute("DROP TABLE videos")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS videos (id TEXT PRIMARY KEY, {columns}, accessed_at REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS accessed ON videos (accessed_at)")
+
+    def fill(self, video: Video) -> bool:
+        """
+        Fill ``video`` with its fresh cached fields. Return ``True`` on a hit, i.e.
+        when no network request is needed for display.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT {} FROM videos WHERE id = ?".format(
+                    ", ".join(f"{field}, {field}_at" for field in self.FIELDS)
+                ),
+                (video.id, ),
+            ).fetchone()
+            if row is not None:
+                with self._connection:
+                    self._connection.execute("UPDATE videos SET accessed_at = ? WHERE id = ?", (now, video.id))
+
+        fresh = {}
+        if row is not None:
+            for i, field in enumerate(self.FIELDS):
+                value, stored_at = row[2 * i], row[2 * i + 1]
+                if value is not None and stored_at is not None and now - stored_at < self.ttls[field]:
+                    fresh[field] = value
+
+        if "thumbnail" in fresh:
+            video.thumbnail = fresh["thumbnail"]
+        if "duration" in fresh:
+            video.duration = int(fresh["duration"])
+        if "upload_time" in fresh:
+            video.upload_time = video.time = int(fresh["upload_time"])  # more accurate than a relative date
+        if "title" in fresh and not video.title:
+            video.title = fresh["title"]
+        if "author" in fresh and not video.author:
+            video.author = fresh["author"]
+
+        hit = "thumbnail" in fresh and "duration" in fresh
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return hit
+
+    def store(self, video: Video):
+        """
+        Save the current metadata of ``video``.
+        """
+        now = time.time()
+        values = {field: getattr(video, field) for field in self.FIELDS}
+        columns = ", ".join(f"{field}, {field}_at" for field in self.FIELDS)
+        placeholders = ", ".join("?, ?" for _ in self.FIELDS)
+        parameters = [video.id]
+        for field in self.FIELDS:
+            parameters += [values[field], now if values[field] is not None else None]
+        parameters.append(now)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO videos (id, {columns}, accessed_at) VALUES (?, {placeholders}, ?)",
+                parameters,
+            )
+            self._connection.execute(
+                "DELETE FROM videos WHERE id IN "
+                "(SELECT id FROM videos ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries, ),
+            )
+
+    def stats(self) -> str:
+        """
+        Return hits and misses for display.
+        """
+        return f"Metadata cache: {self.hits} hits, {self.misses} misses"
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+class MetadataFetcher:
+    """
+    Downloads youtube-dl metadata from many threads, e.g. the workers of a
+    pipeline stage. Each thread reuses its own configured ``YoutubeDL``
+    instance. Usage:
+    ------::
+
+        fetcher = MetadataFetcher(cache=MetadataCache())
+        if not fetcher.cache.fill(video):
+            fetcher.fetch_one(video)  # in any worker thread
+    """
+
+    def __init__(self, cache: Optional[MetadataCache] = None, cancel_token: Optional[CancellationToken] = None):
+        self.cache = cache
+        self.cancel_token = cancel_token
+        self._local = threading.local()
+
+    def _youtube_dl(self) -> YoutubeDL:
+        """
+        Return the ``YoutubeDL`` instance of the calling thread.
+        """
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = self._local.ydl = YoutubeDL({"logger": MyLogger(), "quiet": True})
+        return ydl
+
+    def fetch_one(self, video: Video) -> Video:
+        """
+        Fill ``video`` with its metadata in the calling thread.
+        """
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+        video.download_video_metadata(ydl=self._youtube_dl())
+        if self.cache is not None:
+            self.cache.store(video)
+        return video
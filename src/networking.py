@@ -13,18 +13,27 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from collections import deque
+
 from PyQt5.QtCore import QByteArray, QObject, QUrl, pyqtSignal, pyqtSlot
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+from PyQt5.QtNetwork import (QNetworkAccessManager, QNetworkDiskCache,
+                             QNetworkReply, QNetworkRequest)
+
+from .bandwidth import bandwidth
+from .resources import get_cache_dir
+
+MB = 1024 * 1024
 
 
 class Sender(QObject):
     """
     To be used as QNetworkReply and QNetworkRequest's ``originatingObject``.
     """
-    def __init__(self, sender_name, sender_object):
+    def __init__(self, sender_name, sender_object, url=None):
         super(Sender, self).__init__()
         self._sender_name = sender_name
         self._sender_object = sender_object
+        self.url = url
 
     @property
     def sender_name(self):
@@ -56,9 +65,12 @@ class CustomNetworkManager(QObject):
         foo = CustomNetworkManager()
         # original sender and data are passed
         foo.downloaded.connect(lambda: global_client_loader())
+        # senders of a failed request, to be requested again later
+        foo.failed.connect(lambda sender: retry_later(sender))
         
         # execution continues. The download is tied to sender.
-        foo.start_download(QUrl(my_url), sender)
+        # Senders of a URL already requested share its reply.
+        foo.start_download(my_url, sender)
         
         # in main thread:
         def global_client_loader(sender, byte_array):
@@ -66,10 +78,54 @@ class CustomNetworkManager(QObject):
                 do_stuff(sender,byte_array)
     """
     downloaded = pyqtSignal(QObject, QByteArray)
+    failed = pyqtSignal(QObject)
 
-    def __init__(self):
+    def __init__(self, cache_dir=None, cache_size=100 * MB, offline_first=False, max_per_host=4):
+        """
+        ``cache_dir`` : persistent HTTP cache location, shared by every window.
+        ``cache_size`` : cache quota in bytes, ``0`` disables the cache.
+        ``offline_first`` : use cached replies even if stale, without revalidating.
+        Otherwise Cache-Control is honoured and stale entries are revalidated
+        through their ETag.
+        ``max_per_host`` : requests in flight per host, the rest wait in
+        request order.
+        """
         super().__init__()  # init QObject
         self._manager = QNetworkAccessManager(finished=self._downloadFinished)
+        self.offline_first = offline_first
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.coalesced = 0
+        self.max_per_host = max(1, int(max_per_host))
+        self._senders = {}  # waiting for each requested url
+        self._replies = {}  # in flight, by url
+        self._queued = {}  # urls waiting for a free slot, by host
+        self._active = {}  # requests in flight, by host
+        self._cache = None
+        if cache_size > 0:
+            self._cache = QNetworkDiskCache(self)
+            self._cache.setCacheDirectory(str(cache_dir or get_cache_dir("http")))
+            self._cache.setMaximumCacheSize(cache_size)
+            self._manager.setCache(self._cache)
+
+    @property
+    def cache_size(self) -> int:
+        return self._cache.maximumCacheSize() if self._cache is not None else 0
+
+    @cache_size.setter
+    def cache_size(self, cache_size: int):
+        if self._cache is not None:
+            self._cache.setMaximumCacheSize(cache_size)
+
+    def stats(self) -> str:
+        """
+        Return cache hits, misses, bytes saved and coalesced requests for display.
+        """
+        return (
+            f"Thumbnail cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.bytes_saved / MB:.1f} MB saved, {self.coalesced} coalesced"
+        )
 
     @pyqtSlot(QNetworkReply)
     def _downloadFinished(self, reply: QNetworkReply):
@@ -77,20 +133,106 @@ class CustomNetworkManager(QObject):
         Handle signal 'finished'.  A network request has finished.
         """
         error = reply.error()
-        sender = reply.request().originatingObject()
+        request = reply.request()
+        url = request.attribute(QNetworkRequest.User)
+        reply.deleteLater()  # schedule as per docs
+        if error == QNetworkReply.OperationCanceledError or self._replies.get(url) is not reply:
+            return  # see ``abort``
 
         if error == QNetworkReply.NoError:
             _downloadedData = reply.readAll()
-            reply.deleteLater()  # schedule as per docs
-            self.downloaded.emit(sender, _downloadedData)
+            if reply.attribute(QNetworkRequest.SourceIsFromCacheAttribute):
+                self.hits += 1
+                self.bytes_saved += _downloadedData.size()
+            else:
+                self.misses += 1
+                bandwidth.add_interactive(_downloadedData.size())  # media downloads make room
+            senders = self._finish(url)
+            for sender in senders:
+                self.downloaded.emit(sender, _downloadedData)
+        elif self._cache is not None and \
+                request.attribute(QNetworkRequest.CacheLoadControlAttribute) != QNetworkRequest.AlwaysCache:
+            #* offline, retry with whatever is cached
+            request.setAttribute(QNetworkRequest.CacheLoadControlAttribute, QNetworkRequest.AlwaysCache)
+            self._replies[url] = self._manager.get(request)
         else:
             print("[INFO] Error: {}".format(reply.errorString()))
+            for sender in self._finish(url):
+                self.failed.emit(sender)
 
     def start_download(self, url: str, sender: Sender):
         """
         Use in main application to start a download from ``url`` for
         a given object ``sender``.
         """
+        if sender.url is None:
+            sender.url = url
+        if url in self._senders:
+            #* already requested, e.g. the avatar of a channel with many videos
+            self._senders[url].append(sender)
+            self.coalesced += 1
+            return
+        self._senders[url] = [sender]
+        host = QUrl(url).host()
+        if self._active.get(host, 0) < self.max_per_host:
+            self._get(url)
+        else:
+            self._queued.setdefault(host, deque()).append(url)
+
+    def abort(self, sender: Sender):
+        """
+        Cancel the download started for ``sender``. The request itself is
+        aborted once no other sender waits for it. ``downloaded`` is not
+        emitted for ``sender``.
+        """
+        senders = self._senders.get(sender.url, [])
+        if sender not in senders:
+            return
+        senders.remove(sender)
+        if senders:
+            return
+        url = sender.url
+        del self._senders[url]
+        reply = self._replies.pop(url, None)
+        if reply is None:
+            self._queued[QUrl(url).host()].remove(url)
+        else:
+            reply.abort()
+            self._release(QUrl(url).host())
+
+    def in_flight(self) -> int:
+        """
+        Return the number of requests in flight.
+        """
+        return len(self._replies)
+
+    def queued(self) -> int:
+        """
+        Return the number of requests waiting for a free slot.
+        """
+        return sum(len(urls) for urls in self._queued.values())
+
+    def _get(self, url: str):
+        host = QUrl(url).host()
+        self._active[host] = self._active.get(host, 0) + 1
         request = QNetworkRequest(QUrl(url))
-        request.setOriginatingObject(sender)  # keep track of download issuer
-        self._manager.get(request)
\ No newline at end of file
+        request.setAttribute(QNetworkRequest.User, url)  # keep track of waiting senders
+        request.setAttribute(
+            QNetworkRequest.CacheLoadControlAttribute,
+            QNetworkRequest.PreferCache if self.offline_first else QNetworkRequest.PreferNetwork,
+        )
+        self._replies[url] = self._manager.get(request)
+
+    def _finish(self, url: str):
+        """
+        Free the slot of a completed request. Return the senders waiting for it.
+        """
+        del self._replies[url]
+        self._release(QUrl(url).host())
+        return self._senders.pop(url, [])
+
+    def _release(self, host: str):
+        self._active[host] -= 1
+        queued = self._queued.get(host)
+        while queued and self._active[host] < self.max_per_host:
+            self._get(queued.popleft())
@@ -0,0 +1,254 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import queue
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+_SENTINEL = object()
+_POLL_INTERVAL = 0.1
+
+
+class PipelineStopped(Exception):
+    """
+    Raised by ``put`` once the pipeline has been stopped.
+    """
+
+
+class Stage:
+    """
+    A pipeline step running ``fn(item)`` on ``workers`` threads.
+    Items wait in a queue holding at most ``queue_size`` items, so a full stage
+    blocks the one before it. ``fn`` returns the item for the next stage, or
+    ``None`` to drop it. A ``queue_size`` of ``0`` means no bound: the previous
+    stage never waits for this one. ``queue_factory(maxsize)`` may return any
+    ``queue.Queue`` subclass to change the order items are processed in.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers=1, queue_size=16, queue_factory=queue.Queue):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.queue = queue_factory(queue_size)
+        self.processed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.busy_time = 0.0
+        self.started_at = None
+        self.finished = threading.Event()
+        self._lock = threading.Lock()
+        self._running_workers = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return queue depth, items in flight, processed and failed counts,
+        throughput (items/s) and mean latency (s) of this stage.
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self.started_at if self.started_at is not None else 0.0
+            done = self.processed + self.failed
+            return {
+                "queue_depth": self.queue.qsize(),
+                "in_flight": self.in_flight,
+                "processed": self.processed,
+                "failed": self.failed,
+                "throughput": self.processed / elapsed if elapsed > 0 else 0.0,
+                "latency": self.busy_time / done if done else 0.0,
+            }
+
+
+class Pipeline:
+    """
+    Stages connected by bounded queues. Usage:
+    ------::
+
+        pipeline = Pipeline([
+            Stage("metadata", fetch_metadata, workers=8),
+            Stage("download", download, workers=4),
+        ])
+        pipeline.start()
+        for video in videos:
+            pipeline.put(video)  # blocks while the first stage is full
+        pipeline.close()
+        pipeline.join()
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        on_result: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Stage, Any, BaseException], None]] = None,
+    ):
+        self.stages = stages
+        self.on_result = on_result
+        self.on_error = on_error
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def __getitem__(self, name: str) -> Stage:
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    @property
+    def is_stopped(self):
+        return self._stopped.is_set()
+
+    def start(self):
+        """
+        Start every stage's worker threads.
+        """
+        for index, stage in enumerate(self.stages):
+            stage.started_at = time.monotonic()
+            stage._running_workers = stage.workers
+            for i in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(index, ),
+                    name=f"{stage.name}-{i}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def put(self, item):
+        """
+        Feed ``item`` to the first stage, blocking while it is full.
+        """
+        self._put(self.stages[0], item)
+
+    def feed(self, items: Iterable):
+        """
+        Feed every item to the first stage and close the input.
+        """
+        for item in items:
+            self.put(item)
+        self.close()
+
+    def close(self):
+        """
+        Signal that no more items will be fed. Stages finish once drained.
+        """
+        first_stage = self.stages[0]
+        for _ in range(first_stage.workers):
+            self._put(first_stage, _SENTINEL)
+
+    def stop(self):
+        """
+        Drop pending items and stop workers as soon as their current item is done.
+        """
+        self._stopped.set()
+        for stage in self.stages:
+            while True:
+                try:
+                    stage.queue.get_nowait()
+                except queue.Empty:
+                    break
+
+    def join(self, timeout=None, stage: Optional[str] = None) -> bool:
+        """
+        Wait for every stage, or only up to ``stage``, to finish.
+        Return ``False`` if ``timeout`` was reached.
+        """
+        stages = self.stages if stage is None else self.stages[:self.stages.index(self[stage]) + 1]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for pipeline_stage in stages:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not pipeline_stage.finished.wait(remaining):
+                return False
+        return True
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return ``Stage.stats`` by stage name.
+        """
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def summary(self) -> str:
+        """
+        Return one line of counters per stage.
+        """
+        lines = []
+        for name, stats in self.stats().items():
+            lines.append(
+                f"{name}: {stats['processed']} done, {stats['failed']} failed, "
+                f"{stats['queue_depth']} queued, {stats['in_flight']} in flight, "
+                f"{stats['throughput']:.2f}/s, {stats['latency']:.2f}s per item"
+            )
+        return "\n".join(lines)
+
+    def _put(self, stage: Stage, item):
+        while not self._stopped.is_set():
+            try:
+                stage.queue.put(item, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+        if item is not _SENTINEL:
+            raise PipelineStopped()
+
+    def _work(self, index: int):
+        stage = self.stages[index]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        try:
+            while not self._stopped.is_set():
+                try:
+                    item = stage.queue.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if item is _SENTINEL:
+                    break
+                with stage._lock:
+                    stage.in_flight += 1
+                start = time.monotonic()
+                try:
+                    result = stage.fn(item)
+                except BaseException as error:
+                    with stage._lock:
+                        stage.failed += 1
+                    if self.on_error is not None:
+                        self.on_error(stage, item, error)
+                    else:
+                        traceback.print_exc()
+                    continue
+                finally:
+                    with stage._lock:
+                        stage.in_flight -= 1
+                        stage.busy_time += time.monotonic() - start
+                with stage._lock:
+                    stage.processed += 1
+                if result is None:
+                    continue
+                if next_stage is not None:
+                    try:
+                        self._put(next_stage, result)
+                    except PipelineStopped:
+                        break
+                elif self.on_result is not None:
+                    self.on_result(result)
+        finally:
+            with stage._lock:
+                stage._running_workers -= 1
+                last_worker = stage._running_workers == 0
+            if last_worker:
+                #* the next stage finishes once every worker here is done
+                if next_stage is not None:
+                    for _ in range(next_stage.workers):
+                        self._put(next_stage, _SENTINEL)
+                stage.finished.set()
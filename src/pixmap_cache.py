@@ -0,0 +1,112 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from PyQt5.QtGui import QPixmap
+
+MB = 1024 * 1024
+
+#* (source url, width, height, shape)
+PixmapKey = Tuple[str, int, int, Hashable]
+
+
+class PixmapCache:
+    """
+    In-memory LRU of display-ready pixmaps, already decoded, scaled and painted.
+    Least recently used pixmaps are dropped once ``max_size`` bytes are exceeded.
+    GUI thread only. Usage:
+    ------::
+
+        key = (url, width, height, "round")
+        pixmap = pixmap_cache.get(key)
+        if pixmap is None:
+            pixmap = pixmap_cache.put(key, render(data))
+    """
+
+    def __init__(self, max_size=64 * MB):
+        self._pixmaps = OrderedDict()
+        self._max_size = int(max_size)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cost(pixmap: QPixmap) -> int:
+        """
+        Return the approximate memory taken by ``pixmap`` in bytes.
+        """
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size: int):
+        self._max_size = int(max_size)
+        self._evict()
+
+    def __contains__(self, key: PixmapKey) -> bool:
+        return key in self._pixmaps
+
+    def get(self, key: PixmapKey) -> Optional[QPixmap]:
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self._pixmaps.move_to_end(key)
+        self.hits += 1
+        return pixmap
+
+    def put(self, key: PixmapKey, pixmap: QPixmap) -> QPixmap:
+        """
+        Store ``pixmap`` under ``key`` and return it.
+        Pixmaps bigger than the whole budget are not stored.
+        """
+        if key in self._pixmaps:
+            self.size -= self.cost(self._pixmaps.pop(key))
+        if pixmap.isNull() or self.cost(pixmap) > self._max_size:
+            return pixmap
+        self._pixmaps[key] = pixmap
+        self.size += self.cost(pixmap)
+        self._evict()
+        return pixmap
+
+    def clear(self):
+        """
+        Drop every pixmap.
+        """
+        self._pixmaps.clear()
+        self.size = 0
+
+    def stats(self) -> str:
+        """
+        Return hits, misses and size for display.
+        """
+        return (
+            f"Image cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.size / MB:.1f}/{self._max_size / MB:.0f} MB"
+        )
+
+    def _evict(self):
+        while self.size > self._max_size and self._pixmaps:
+            _, pixmap = self._pixmaps.popitem(last=False)
+            self.size -= self.cost(pixmap)
+
+
+#* shared by every window of the app
+pixmap_cache = PixmapCache()
@@ -0,0 +1,91 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import threading
+import time
+from collections import deque
+
+
+class ProgressThrottle:
+    """
+    Lets through at most one update every ``interval`` seconds. Final updates
+    always pass, so the last state is never dropped.
+    """
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self._last = None
+
+    def ready(self, final=False) -> bool:
+        """
+        Return ``True`` if an update is due, always for the ``final`` one.
+        """
+        now = time.monotonic()
+        if final or self._last is None or now - self._last >= self.interval:
+            self._last = now
+            return True
+        return False
+
+
+class TransferMeter:
+    """
+    Thread-safe count of bytes transferred by every download, giving the
+    aggregate speed over the last ``window`` seconds.
+    """
+
+    def __init__(self, window=3.0):
+        self.window = window
+        self.total_bytes = 0
+        self._samples = deque()
+        self._lock = threading.Lock()
+
+    def add(self, byte_count: int):
+        """
+        Record ``byte_count`` bytes just transferred.
+        """
+        if byte_count <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self.total_bytes += byte_count
+            self._samples.append((now, byte_count))
+            self._expire(now)
+
+    def rate(self) -> float:
+        """
+        Return the bytes/s of the last ``window`` seconds.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            return sum(byte_count for _, byte_count in self._samples) / self.window
+
+    def _expire(self, now: float):
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+
+
+def format_rate(bytes_per_second: float) -> str:
+    """
+    Return a transfer rate in human readable units.
+    """
+    for unit in ("B/s", "KB/s", "MB/s"):
+        if bytes_per_second < 1024 or unit == "MB/s":
+            return f"{bytes_per_second:.1f} {unit}"
+        bytes_per_second /= 1024
+
+
+#* shared by every download of the app
+transfer_meter = TransferMeter()
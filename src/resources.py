@@ -15,9 +15,11 @@
 
 # yapf: disable
 
+import os
 import re
 import sys
 import time
+from contextlib import contextmanager
 from pathlib import Path
 
 
@@ -33,6 +35,40 @@ def get_path(relative_path):
     return base_path / rel_path
 
 
+def get_cache_dir(*subdirs) -> Path:
+    """
+    Return the persistent per-user cache dir for the app, creating it if needed.
+    """
+    if sys.platform == "win32":
+        base_path = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"), "Youtube Scraper")
+    else:
+        base_path = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"), "youtube-scraper")
+    cache_dir = base_path.joinpath(*subdirs)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def get_physical_cpu_count() -> int:
+    """
+    Return the number of physical cores, ignoring hyperthreading when possible.
+    """
+    try:
+        import psutil
+        count = psutil.cpu_count(logical=False)
+        if count:
+            return count
+    except ImportError:
+        pass
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            cores = set(re.findall(r"physical id\s*:\s*(\d+).*?core id\s*:\s*(\d+)", f.read(), re.S))
+        if cores:
+            return len(cores)
+    except OSError:
+        pass
+    return os.cpu_count() or 1
+
+
 def get_timestamp_from_relative_time(rel_time: str):
     """Return a timestamp from a relative ``rel_time``, e.g. ``3 minutes ago``."""
     now = time.time()
@@ -71,6 +107,36 @@ def get_sec_from_hhmmss(my_time: str):
         
     return int(h) * 3600 + int(m) * 60 + int(s)
 
+class PhaseTimer(object):
+    """
+    Accumulates wall time per named phase. Usage:
+    ------::
+
+        timer = PhaseTimer()
+        with timer.phase("scroll wait"):
+            do_stuff()
+        print(timer.summary())
+    """
+    def __init__(self) -> None:
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Context manager adding the time spent in its block to phase ``name``.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def summary(self) -> str:
+        """
+        Return one ``name: seconds`` line per phase.
+        """
+        return "\n".join(f"{name}: {seconds:.2f}s" for name, seconds in self.phases.items())
+
 class MyIcons(object):
     """
     Icons to be initialized in QMainWindow.
@@ -0,0 +1,171 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import heapq
+import itertools
+import queue
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+#* unranked items go after every ranked one, in arrival order
+DEFAULT_RANK = 1 << 30
+#* items without a key (e.g. end of stream markers) always go last
+_LAST = float("inf")
+
+
+def video_key(item: Any) -> Optional[Hashable]:
+    """
+    Return the job key of a ``Video``, its id.
+    """
+    return getattr(item, "id", None)
+
+
+class PriorityJobQueue(queue.Queue):
+    """
+    ``queue.Queue`` returning the items with the lowest rank first, then in
+    arrival order. Ranks are given by key and can change while items wait:
+    ------::
+
+        jobs = PriorityJobQueue(maxsize=16)
+        jobs.put(video_a); jobs.put(video_b)
+        jobs.prioritize([video_b.id])  # video_b is returned first
+    """
+
+    def __init__(self, maxsize=0, key: Callable[[Any], Optional[Hashable]] = video_key):
+        self.key = key
+        self._ranks = {}
+        self._counter = itertools.count()
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self.queue = []
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _rank(self, item) -> float:
+        key = self.key(item)
+        if key is None:
+            return _LAST
+        return self._ranks.get(key, DEFAULT_RANK)
+
+    def _put(self, item):
+        heapq.heappush(self.queue, [self._rank(item), next(self._counter), item])
+
+    def _get(self):
+        return heapq.heappop(self.queue)[-1]
+
+    def prioritize(self, keys: Iterable[Hashable]):
+        """
+        Rank the items matching ``keys`` first, in the given order.
+        Previous priorities are dropped.
+        """
+        with self.mutex:
+            self._ranks = {key: rank for rank, key in enumerate(keys)}
+            self._rerank()
+
+    def set_rank(self, key: Hashable, rank: int):
+        """
+        Change the rank of a single ``key``. Lower ranks are returned first.
+        """
+        with self.mutex:
+            self._ranks[key] = rank
+            self._rerank()
+
+    def pending(self):
+        """
+        Return the waiting items in the order they would be returned.
+        """
+        with self.mutex:
+            return [entry[-1] for entry in sorted(self.queue)]
+
+    def _rerank(self):
+        for entry in self.queue:
+            entry[0] = self._rank(entry[-1])
+        heapq.heapify(self.queue)
+
+
+class Prefetcher:
+    """
+    Keeps the ``ahead`` tracks after the selected one and the ``behind`` tracks
+    before it first in line, so skipping plays an already downloaded file.
+    Rows wrap around like the next/previous song buttons. After a jump, running
+    jobs outside the window can be preempted to make room for it. Usage:
+    ------::
+
+        prefetcher = Prefetcher(queues, ahead=3, behind=1)
+        video_ids = [video.id for video in listed_videos]
+        prefetcher.update(current_row, video_ids)
+        prefetcher.preempt(current_row, video_ids, download_jobs, running_downloads)
+    """
+
+    def __init__(self, queues: Iterable[PriorityJobQueue] = (), ahead=3, behind=1):
+        self.queues = list(queues)
+        self.ahead = ahead
+        self.behind = behind
+
+    def window(self, row: int, count: int):
+        """
+        Return the rows to prefetch around ``row`` in priority order: the selected
+        one, the following ones, then the previous ones.
+        """
+        if count <= 0:
+            return []
+        row = min(max(row, 0), count - 1)
+        rows = [row]
+        rows += [(row + offset) % count for offset in range(1, self.ahead + 1)]
+        rows += [(row - offset) % count for offset in range(1, self.behind + 1)]
+        return list(dict.fromkeys(rows))
+
+    def update(self, row: int, keys: List[Hashable]):
+        """
+        Rank the jobs of the window around ``row`` first. Jobs of a previous window
+        that are still waiting go back to their regular order.
+        """
+        window_keys = [keys[window_row] for window_row in self.window(row, len(keys)) if keys[window_row] is not None]
+        for jobs in self.queues:
+            jobs.prioritize(window_keys)
+        return window_keys
+
+    def preempt(self, row: int, keys: List[Hashable], jobs: PriorityJobQueue, running: Dict[Hashable, Any]) -> List[Hashable]:
+        """
+        Cancel running jobs outside the window around ``row`` while jobs of the
+        window wait in ``jobs`` for a worker, at most one per waiting job.
+        ``running`` maps the keys of running jobs to their ``CancellationToken``.
+        Return the keys of the preempted jobs, to be queued again.
+        """
+        window_keys = [keys[window_row] for window_row in self.window(row, len(keys)) if keys[window_row] is not None]
+        waiting_keys = {jobs.key(item) for item in jobs.pending()}
+        waiting = [key for key in window_keys if key in waiting_keys]
+        outside = [key for key in running if key not in window_keys]
+        preempted = outside[:len(waiting)]
+        for key in preempted:
+            running[key].preempt()
+        return preempted
+
+
+def viewport_rows(first: int, last: int, count: int, margin=0) -> List[int]:
+    """
+    Return the rows to load for a viewport showing rows ``first`` to ``last``:
+    the visible ones top to bottom, then up to ``margin`` rows below it, then
+    up to ``margin`` rows above it.
+    """
+    if count <= 0:
+        return []
+    first = min(max(first, 0), count - 1)
+    last = min(max(last, first), count - 1)
+    rows = list(range(first, last + 1))
+    rows += range(last + 1, min(last + margin, count - 1) + 1)
+    rows += range(first - 1, max(first - margin, 0) - 1, -1)
+    return rows
@@ -0,0 +1,184 @@
+# Copyright (C) 2021 Daniel Castro
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+#* youtube-dl audio extensions, in order of preference, and their MIME types
+AUDIO_MIME_TYPES = {
+    "m4a": "audio/mp4",
+    "webm": "audio/webm",
+    "opus": "audio/ogg",
+    "ogg": "audio/ogg",
+}
+
+#* bytes downloaded before playback may start
+STREAM_BUFFER_BYTES = 256 * 1024
+
+_CHUNK_SIZE = 64 * 1024
+_POLL_INTERVAL = 0.05
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    """
+    Serves a download in progress, waiting for bytes that are not there yet.
+    """
+
+    def do_GET(self):
+        video_id = self.path.lstrip("/").split(".")[0]
+        video = self.server.stream_server.get(video_id)
+        if video is None or video.stream_filename is None:
+            self.send_error(404)
+            return
+
+        total = video.total_bytes
+        start, end = 0, None
+        match = _RANGE_RE.fullmatch(self.headers.get("Range", ""))
+        if match and total is not None and match.group(1):
+            start = int(match.group(1))
+            end = min(int(match.group(2)), total - 1) if match.group(2) else total - 1
+            if start >= total:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{total}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+            self.send_header("Content-Length", str(end - start + 1))
+        else:
+            self.send_response(200)
+            if total is not None:
+                end = total - 1
+                self.send_header("Content-Length", str(total))
+        extension = video.stream_filename.rsplit(".", 1)[-1]
+        self.send_header("Content-Type", AUDIO_MIME_TYPES.get(extension, "application/octet-stream"))
+        self.send_header("Accept-Ranges", "bytes" if total is not None else "none")
+        self.end_headers()
+
+        position = start
+        try:
+            while end is None or position <= end:
+                size = _CHUNK_SIZE if end is None else min(_CHUNK_SIZE, end + 1 - position)
+                chunk = self.server.stream_server.read(video, position, size)
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                position += len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the player seeked or stopped
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StreamServer:
+    """
+    Loopback HTTP server that lets ``QMediaPlayer`` play a ``Video`` while it is
+    being downloaded. Reads past the downloaded range block for up to
+    ``wait_timeout`` seconds. Usage:
+    ------::
+
+        server = StreamServer()
+        if server.is_ready(video):
+            player.setMedia(QMediaContent(QUrl(server.url(video))))
+        ...
+        server.close()
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, wait_timeout=30):
+        self.wait_timeout = wait_timeout
+        self._videos = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StreamHandler)
+        self._server.daemon_threads = True
+        self._server.stream_server = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stream-server", daemon=True)
+        self._thread.start()
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def get(self, video_id: str):
+        with self._lock:
+            return self._videos.get(video_id)
+
+    @staticmethod
+    def is_ready(video, min_bytes=STREAM_BUFFER_BYTES) -> bool:
+        """
+        Return ``True`` once enough of ``video`` is downloaded to start playing.
+        """
+        if video.stream_filename is None:
+            return False
+        return video.stream_complete or video.downloaded_bytes >= min_bytes
+
+    def url(self, video) -> str:
+        """
+        Return the stream URL of ``video``, serving it from now on.
+        Like the player, only one video is served at a time: the others are released.
+        """
+        self.release(keep=video)
+        with self._lock:
+            self._videos[video.id] = video
+        video.set_streaming(True)
+        extension = video.stream_filename.rsplit(".", 1)[-1]
+        return f"{self.address}/{video.id}.{extension}"
+
+    def read(self, video, position: int, size: int) -> bytes:
+        """
+        Return up to ``size`` bytes of ``video`` from ``position``, waiting until
+        they are downloaded. Return ``b""`` at the end or on timeout.
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            complete = video.stream_complete
+            available = video.total_bytes if complete and video.total_bytes else video.downloaded_bytes
+            if position < available or (complete and not video.total_bytes):
+                #* the partial file is renamed once the download finishes
+                for path in filter(None, (video.stream_tmpfilename, video.stream_filename)):
+                    try:
+                        with open(path, "rb") as f:
+                            f.seek(position)
+                            return f.read(size if complete else min(size, available - position))
+                    except OSError:
+                        continue
+            elif complete:
+                return b""
+            if time.monotonic() > deadline:
+                return b""
+            time.sleep(_POLL_INTERVAL)
+
+    def release(self, keep=None):
+        """
+        Stop serving every video but ``keep``. Their files may be removed from now
+        on, e.g. once converted.
+        """
+        with self._lock:
+            released = [video for video in self._videos.values() if video is not keep]
+            self._videos = {video.id: video for video in self._videos.values() if video is keep}
+        for video in released:
+            video.set_streaming(False)
+
+    def close(self):
+        """
+        Stop serving, releasing the file being streamed.
+        """
+        self.release()
+        self._server.shutdown()
+        self._server.server_close()
@@ -14,25 +14,35 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import copy
+import json
 import os
 import re
+import subprocess
+import threading
 import time
+from datetime import datetime, timezone
 from logging import info
-from sys import platform
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import selenium.webdriver.support.expected_conditions as EC
 from bs4 import BeautifulSoup
 from lxml import etree
-from selenium import webdriver
-from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.wait import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
 from youtube_dl import YoutubeDL
+from youtube_dl.postprocessor.ffmpeg import FFmpegPostProcessor
 
-from .resources import get_sec_from_hhmmss, get_timestamp_from_relative_time
+from .bandwidth import bandwidth
+from .custom_threading import CancellationToken
+from .downloader import DownloadSession
+from .driver_service import DriverService
+from .feed_parser import (FEED_STATE_SCRIPT, NEW_RENDERERS_SCRIPT, FeedRecord, parse_renderer,
+                          records_from_source)
+from .media_cache import MediaCache
+from .progress import ProgressThrottle, transfer_meter
+from .resources import PhaseTimer, get_sec_from_hhmmss, get_timestamp_from_relative_time
 
 
 class MyLogger(object):
@@ -58,10 +68,46 @@ class MissingHtmlElements(Exception):
     pass
 
 
+class feed_updated(object):
+    """
+    ``WebDriverWait`` condition met when the feed holds more than ``count`` video
+    renderers, when its end has been reached or when the network has been idle for
+    ``idle_time`` seconds. Returns the last feed state.
+    """
+    def __init__(self, count, idle_time=1.0):
+        self.count = count
+        self.idle_time = idle_time
+        self._resources = None
+        self._idle_since = time.monotonic()
+
+    def __call__(self, driver):
+        state = driver.execute_script(FEED_STATE_SCRIPT)
+        if state["renderers"] > self.count:
+            return state
+        if state["renderers"] > 0 and not state["continuation"]:
+            #* end of feed, unless nothing has been rendered yet
+            return state
+        if state["resources"] != self._resources:
+            self._resources = state["resources"]
+            self._idle_since = time.monotonic()
+            return False
+        if time.monotonic() - self._idle_since >= self.idle_time:
+            return state
+        return False
+
+
+def get_thumbnail_url(video_id, quality="mqdefault"):
+    """
+    Return the thumbnail url YouTube serves for any ``video_id``.
+    """
+    return f"https://i.ytimg.com/vi/{video_id}/{quality}.jpg"
+
+
 class Video:
     """
     Store video information for ease of use.
     Download it in parallel using ``start_download`` in a worker.
+    ``style`` : feed badge, either ``DEFAULT``, ``LIVE`` or ``UPCOMING`` (premieres).
     """
 
     def __init__(
@@ -72,68 +118,247 @@ class Video:
         author="",
         author_id="",
         duration=0,
+        thumbnail=None,
+        style="DEFAULT",
     ):
         self.id = str(id)
         self.url = "https://www.youtube.com/watch?v=" + self.id
         self.title = str(title)
         self.time = int(time)
+        #* absolute upload time from youtube-dl, ``time`` may be a relative estimate
+        self.upload_time = None
         self.author = str(author)
         self.author_id = str(author_id)
         self.duration = int(duration)  # hh:mm:ss format
-        self.thumbnail = None
+        self.thumbnail = thumbnail
+        self.is_live = style == "LIVE"
+        self.is_upcoming = style == "UPCOMING"
         self.author_thumbnail = None
         self.download_path = None
         self.is_downloaded = False
+        self.needs_conversion = False
+        self._downloaded_file = None
+        self._media_cache = None
+        self._cancel_token = None
+        self.stream_filename = None
+        self.stream_tmpfilename = None
+        self.total_bytes = None
+        self.downloaded_bytes = 0
+        self.stream_complete = False
+        #* files kept while ``StreamServer`` serves them, see ``set_streaming``
+        self._streaming = False
+        self._stream_lock = threading.Lock()
+        self._kept_for_stream = []
+        #* ``WorkerSignals`` of the list item, emitting download percent
+        self.progress_signals = None
+        self._progress_throttle = ProgressThrottle()
         self.download_button = None
+        self.download_state = None
 
-    def start_download(self, download_dir):
+    def start_download(
+        self,
+        download_dir,
+        native_formats: Optional[List[str]] = None,
+        convert_later=False,
+        media_cache: Optional[MediaCache] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        session: Optional[DownloadSession] = None,
+    ):
         """
         ``download_dir`` : temp dir or user-defined.
+        ``native_formats`` : audio extensions the player decodes, in order of preference.
+        The best matching audio stream is kept as is and only converted to mp3 if
+        none is available. Every download is converted to mp3 if not given.
+        ``convert_later`` : leave the conversion to a later ``convert_to_mp3`` call,
+        see ``needs_conversion``.
+        ``media_cache`` : returns right away if a playable file is cached, else
+        the finished file is added to it. ``download_dir`` must be its directory.
+        ``cancel_token`` : stops the download or conversion, deleting partial files.
+        ``session`` : shared ``DownloadSession``, else a single use one is created.
         """
         self._download_dir = download_dir
-        self.download_path = os.path.join(download_dir, f"{self.id}.mp3")
+        self._media_cache = media_cache
+        self._cancel_token = cancel_token
+        if cancel_token is not None and cancel_token.is_cancelled:
+            return
+        if media_cache is not None:
+            cached_path = media_cache.lookup(self.id, (native_formats or []) + ["mp3"])
+            if cached_path is not None:
+                self.download_path = cached_path
+                self.is_downloaded = True
+                self.set_download_state("conversion_finished")
+                return
         # do not set extension explicitly bc of conversion done internally
-        outtmpl = self.download_path.replace(".mp3", r".%(ext)s")
+        outtmpl = os.path.join(download_dir, f"{self.id}.%(ext)s")
+        if native_formats:
+            audio_format = "/".join([f"bestaudio[ext={ext}]" for ext in native_formats] + ["bestaudio"])
+        else:
+            audio_format = "bestaudio"
         self.ydl_opts = {
-            "format": "bestaudio",
-            "postprocessors": [
-                {
-                    "key": "FFmpegExtractAudio",
-                    "preferredcodec": "mp3",
-                    "preferredquality": "128",
-                }
-            ],
-            "logger": MyLogger(),
-            "progress_hooks": [self._progress_hook],
+            "format": audio_format,
             "outtmpl": outtmpl,
         }
-        with YoutubeDL(self.ydl_opts) as ydl:
+        if session is None:
+            session = DownloadSession({"logger": MyLogger()})
+        try:
+            info_dict, self._downloaded_file = session.download(self.url, self.ydl_opts, self._progress_hook)
+        except:
+            if cancel_token is not None and cancel_token.is_cancelled:
+                if not cancel_token.preempted:
+                    self._remove_partial_files()
+                #* else youtube-dl resumes the partial file when started again
+                return
+            self._download_fail()
+            return
+        #* full metadata is only available now in fast listing mode
+        self.thumbnail = self.thumbnail or info_dict.get("thumbnail")
+        self.duration = info_dict.get("duration") or self.duration
+        #* without native formats or if the player can't decode the only available stream
+        self.needs_conversion = not native_formats or info_dict.get("ext") not in native_formats
+        if not self.needs_conversion:
+            self.download_path = self._cache(self._downloaded_file)
+        elif not convert_later:
+            self.convert_to_mp3()
+
+    def convert_to_mp3(self, cancel_token: Optional[CancellationToken] = None):
+        """
+        Convert the downloaded file to mp3 through FFmpeg, replacing it.
+        ``download_path`` is only set once the converted file is ready.
+        ``cancel_token`` : terminates FFmpeg, the download's token if not given.
+        """
+        cancel_token = cancel_token or self._cancel_token
+        ffmpeg = FFmpegPostProcessor()
+        if not ffmpeg.available:
+            print("FFmpeg not found, can't convert downloads")
+            self._download_fail()
+            return
+        mp3_path = os.path.splitext(self._downloaded_file)[0] + ".mp3"
+        command = [
+            ffmpeg.executable, "-y", "-loglevel", "error", "-i", self._downloaded_file,
+            "-vn", "-codec:a", "libmp3lame", "-b:a", "128k", mp3_path,
+        ]
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if cancel_token is not None:
+            cancel_token.add_process(process)  # terminated on cancel
+        try:
+            _, stderr = process.communicate()
+        finally:
+            if cancel_token is not None:
+                cancel_token.remove_process(process)
+        if process.returncode != 0:
+            self._remove_files(mp3_path)
+            if cancel_token is not None and cancel_token.is_cancelled:
+                self._remove_partial_files()
+                return
+            print(stderr.decode("utf8", "replace").strip())
+            self._download_fail()
+            return
+        self._remove_source(self._downloaded_file)
+        self.download_path = self._cache(mp3_path)
+        self.needs_conversion = False
+        self.set_download_state("conversion_finished")
+
+    def _remove_partial_files(self):
+        """
+        Delete whatever an interrupted download or conversion left behind.
+        """
+        paths = [self.stream_tmpfilename]
+        if self.stream_filename is not None:
+            paths.append(self.stream_filename + ".ytdl")
+        if self.download_path is None:
+            paths += [self.stream_filename, self._downloaded_file]
+        self._remove_files(*paths)
+
+    def set_streaming(self, streaming: bool):
+        """
+        Called by ``StreamServer``. While streamed, the download is kept after its
+        conversion and removed once the stream is released.
+        """
+        with self._stream_lock:
+            self._streaming = streaming
+            if streaming:
+                return
+            paths, self._kept_for_stream = self._kept_for_stream, []
+        self._remove_files(*paths)
+
+    def _remove_source(self, path: str):
+        with self._stream_lock:
+            if self._streaming:
+                self._kept_for_stream.append(path)
+                return
+        self._remove_files(path)
+
+    @staticmethod
+    def _remove_files(*paths):
+        for path in set(filter(None, paths)):
             try:
-                ydl.download([self.url])
-            except:
-                self._download_fail()
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _cache(self, path: str) -> str:
+        if self._media_cache is None:
+            return path
+        return self._media_cache.add(self.id, path)
 
-    def download_video_metadata(self):
+    def download_video_metadata(self, ydl: Optional[YoutubeDL] = None):
         """
         Downloads additional metadata through youtube-dl.
+        ``ydl`` : configured instance to reuse, else a new one is created.
         """
-        info_dict = YoutubeDL().extract_info(self.url, download=False)
+        if ydl is None:
+            ydl = YoutubeDL()
+        info_dict = ydl.extract_info(self.url, download=False)
         self.thumbnail = info_dict["thumbnail"]
         self.duration = info_dict["duration"]
+        if info_dict.get("timestamp"):
+            self.upload_time = int(info_dict["timestamp"])
+        elif info_dict.get("upload_date"):
+            upload_date = datetime.strptime(info_dict["upload_date"], "%Y%m%d").replace(tzinfo=timezone.utc)
+            self.upload_time = int(upload_date.timestamp())
         # self.author_thumbnail =
 
     def _progress_hook(self, d):
-        # TODO more accurate conversion status after conversion:
-        # download_button.icon = "file_download_done"
-        # ? would require external FFmpeg usage
-
-        if d["status"] == "finished":
+        #* youtube-dl stops downloading when a hook raises
+        if self._cancel_token is not None:
+            self._cancel_token.raise_if_cancelled()
+
+        #* followed while downloading for progressive playback
+        self.stream_filename = d.get("filename")
+        self.stream_tmpfilename = d.get("tmpfilename")
+        self.total_bytes = d.get("total_bytes") or self.total_bytes
+        downloaded_bytes = d.get("downloaded_bytes") or self.downloaded_bytes
+        transfer_meter.add(downloaded_bytes - self.downloaded_bytes)
+        #* blocks the download thread while over the global budget
+        bandwidth.consume_media(downloaded_bytes - self.downloaded_bytes, self._cancel_token)
+        self.downloaded_bytes = downloaded_bytes
+        finished = d["status"] == "finished"
+        #* many callbacks per second, the GUI only gets a few
+        if self.progress_signals is not None and self._progress_throttle.ready(final=finished):
+            total_bytes = self.total_bytes or d.get("total_bytes_estimate")
+            if finished or total_bytes:
+                percent = 100 if finished else int(100 * self.downloaded_bytes / total_bytes)
+                self.progress_signals.progress.emit(min(percent, 100))
+        if finished:
             print(f"Done downloading {self.title}. Converting...")
+            self.stream_complete = True
             self._download_success()
             self.is_downloaded = True
 
+    def set_download_state(self, state: str):
+        """
+        Keep track of the download ``state`` and show it in ``download_button``,
+        which may not exist yet if the video is downloaded before being listed.
+        """
+        self.download_state = state
+        if self.download_button is not None:
+            self.download_button.icon = state
+        if state == "download_fail" and self.progress_signals is not None:
+            #* hides the progress bar, else left at its last value
+            self.progress_signals.progress.emit(100)
+
     def _download_success(self):
-        self.download_button.icon = "download_success"
+        self.set_download_state("download_success")
 
         # #? 'postprocessors' key to convert everything to mp3 is reccommended instead
         # #? windows: see qmedia formats supported through DirectShow
@@ -142,7 +367,7 @@ class Video:
         #     self.download_path = matching_video[0]
 
     def _download_fail(self):
-        self.download_button.icon = "download_fail"
+        self.set_download_state("download_fail")
 
 
 class YoutubeScraper:
@@ -150,59 +375,113 @@ class YoutubeScraper:
     Youtube subscription feed scraping object.
     """
 
-    def __init__(self, max_videos, max_date, user_data=None, last_video_id=None):
+    def __init__(
+        self,
+        max_videos,
+        max_date,
+        user_data=None,
+        last_video_id=None,
+        last_video_time=None,
+        incremental=True,
+        load_timeout=8,
+        scroll_timeout=5,
+        max_stalled_scrolls=3,
+        driver_service=None,
+        cancel_token: Optional[CancellationToken] = None,
+    ):
+        """
+        ``load_timeout`` and ``scroll_timeout`` : maximum seconds to wait for the feed
+        to load and for new videos after each scroll.
+        ``max_stalled_scrolls`` : consecutive scrolls without new videos, while the
+        feed still has a continuation, before giving up on it.
+        ``last_video_id`` : newest video of a previous scrape. Scrolling stops once it
+        is found and only newer videos are returned.
+        ``last_video_time`` : upload time of ``last_video_id``. Older videos are not
+        returned either, in case it has been removed from the feed.
+        ``driver_service`` : shared ``DriverService`` kept warm across scrapes, used by
+        one scrape at a time. A private one is created and quit after scraping if
+        none is given.
+        ``cancel_token`` : raises ``Cancelled`` between scrolls once cancelled.
+        """
         self.max_videos = max_videos
-        self.max_date = max_date
+        self.max_date = max_date if last_video_time is None else max(max_date, last_video_time)
         self.last_video_id = last_video_id
-        self._user_data = user_data
+        self.incremental = incremental
+        self.records: List[FeedRecord] = []
+        self._cursor = 0
+        self._seen_ids: Set[str] = set()
+        self._local_source = False
+        self.load_timeout = load_timeout
+        self.scroll_timeout = scroll_timeout
+        self.max_stalled_scrolls = max_stalled_scrolls
+        self.timings = PhaseTimer()
+        self.cancel_token = cancel_token
+        self.driver = None
+        self._owns_driver_service = driver_service is None
+        self.driver_service = driver_service if driver_service is not None else DriverService(user_data)
 
     @property
     def user_data(self):
-        return self._user_data
+        return self.driver_service.user_data
 
     @user_data.setter
     def user_data(self, user_data):
         if self.user_data == user_data:
             return
-        self._user_data = user_data
+        self.driver_service.user_data = user_data
 
     def get_videos_from_feed(self, local_dir=None) -> Dict[str, Video]:
         """
         Return a dictionary of ``Video`` instances accessed by ``id``.
         """
+        for _ in self.iter_videos_from_feed(local_dir):
+            pass
+        return self.my_videos
 
-        driver_setup_success = self._setup_driver()
-        if not driver_setup_success:
-            raise InvalidUserDataFolder("Select a valid browser user data folder.")
+    def iter_videos_from_feed(self, local_dir=None) -> Iterator[Video]:
+        """
+        Yield ``Video`` instances as soon as each scroll batch is parsed,
+        without duplicates and already filtered by ``max_date``, ``max_videos``
+        and ``last_video_id``. Scrolling stops when the generator is closed.
+        Videos yielded so far are kept in ``my_videos``.
+        """
+        self.timings = PhaseTimer()
+        self.my_videos = {}
         print("\nRETRIEVING YOUTUBE DATA...\n")
 
-        if local_dir:
-            with open(local_dir, "r", encoding="utf8") as f:
-                self.source = f.read()
-        else:
-            # * create new tab
-            self.driver.execute_script("window.open('about:blank','_blank');")
-            new_tab = self.driver.window_handles[1]
-            self.driver.switch_to.window(new_tab)
-            self.driver.get("https://www.youtube.com/feed/subscriptions")
-            time.sleep(8)
-            self.source = self.driver.page_source
-
-        # TODO all author profile thumbnails in sidebar>subscriptions
+        self._local_source = bool(local_dir)
+        if not self._local_source:
+            self.driver_service.acquire()
+        try:
+            if local_dir:
+                with open(local_dir, "r", encoding="utf8") as f:
+                    self.source = f.read()
+            else:
+                with self.timings.phase("feed load"):
+                    driver_setup_success = self._setup_driver()
+                    if not driver_setup_success:
+                        raise InvalidUserDataFolder("Select a valid browser user data folder.")
+                    self.wait_for_feed(0, self.load_timeout)
+                    if not self.incremental:
+                        self.source = self.driver.page_source
 
-        # self.extract_author_thumbnails()
+            # TODO all author profile thumbnails in sidebar>subscriptions
 
-        self.get_videos_metadata()
+            # self.extract_author_thumbnails()
 
-        self.stop_scraping()
-
-        return self.my_videos
+            yield from self.iter_videos_metadata()
+        finally:
+            self.stop_scraping()
+            if not self._local_source:
+                self.driver_service.release()
+            print(f"\nScraping time per phase:\n{self.timings.summary()}\n")
 
     def stop_scraping(self):
         """
-        Quit driver gracefully.
+        Quit driver gracefully, unless it belongs to a shared ``DriverService``.
         """
-        self.driver.quit()
+        if self._owns_driver_service:
+            self.driver_service.quit()
 
     def _scroll_down(self):
         self.driver.find_element_by_tag_name("html").send_keys(Keys.END)
@@ -211,95 +490,140 @@ class YoutubeScraper:
         #     self.driver.execute_script("window.scrollBy(0, 1000);")
 
     def _setup_driver(self):
-        if self._user_data is None:
-            if platform == "win32":
-                self._user_data = os.path.expanduser("~") + r"\AppData\Local\Google\Chrome\User Data"
-                print(r"os.path.expanduser('~') + r'\AppData\Local\Google\Chrome\User Data'")
-                print(self._user_data)
-            elif platform == "linux":
-                self._user_data = os.path.expanduser("~") + r"/.config/google-chrome"
-
-        # ? automatic driver detection
-        chrome_driver_path = ChromeDriverManager().install()
-        os.environ["PATH"] += os.pathsep + chrome_driver_path
-
-        options = webdriver.ChromeOptions()
-        # options.add_argument("--no-sandbox")  # Bypass OS security model
-        # options.add_argument("--disable-gpu")  # applicable to windows os only
-        options.add_argument("--disable-dev-shm-usage")  # overcome limited resource problems
-        options.add_argument("--disable-extensions")
-        options.add_argument("--window-size=1920,1080")  # enable clicking in headles
-        options.add_argument(r"--user-data-dir=" + self.user_data)
-        options.add_argument("--headless")
-        try:
-            self.driver = webdriver.Chrome(chrome_driver_path, options=options)
-        except WebDriverException:
-            print("\n provide a valid user data folder \n")
-            return False
-        # self.driver.maximize_window()
-        return True
+        """
+        Get a live driver with the subscriptions feed loaded.
+        """
+        self.driver = self.driver_service.open_feed()
+        return self.driver is not None
 
     def get_videos_metadata(self):
         """
-        Extract a list containing all videos' unparsed metadata.
+        Extract a dictionary containing all videos' metadata into ``my_videos``.
         """
-        (
-            upload_dates,
-            video_links,
-            authors,
-            author_channels,
-            video_durations,
-            video_titles,
-        ) = self.extract_video_elements()
-        for i in video_durations:
-            if "días" in i:
+        self.my_videos = {}
+        for _ in self.iter_videos_metadata():
+            pass
+
+    def iter_videos_metadata(self) -> Iterator[Video]:
+        """
+        Yield a ``Video`` for every new record until the checkpoint, the oldest date
+        or the maximum number of videos is reached.
+        """
+        for record in self.iter_records():
+            if self.cancel_token is not None:
+                self.cancel_token.raise_if_cancelled()
+            if record.video_id == self.last_video_id:
+                print(f"\nCheckpoint {self.last_video_id} reached. Stopped scrolling.\n")
+                return  # already seen in a previous scrape
+            if record.video_id in self.my_videos:
+                continue
+            if not record.upload_date and record.style != "DEFAULT":
+                video_time = int(time.time())  # live video or premiere
+            else:
+                video_time = get_timestamp_from_relative_time(record.upload_date)
+            if len(self.my_videos) >= self.max_videos or video_time <= self.max_date:
+                return
+
+            video = Video(
+                id=record.video_id,
+                title=record.title,
+                author=record.author,
+                author_id=record.author_id,
+                duration=get_sec_from_hhmmss(record.duration),
+                time=video_time,
+                thumbnail=get_thumbnail_url(record.video_id),
+                style=record.style,
+            )
+            video.author_thumbnail = record.author_thumbnail
+            self.my_videos[video.id] = video
+            yield video
+
+    def iter_records(self) -> Iterator[FeedRecord]:
+        """
+        Yield feed records as they are parsed, scrolling down for more until
+        the end of the feed, i.e. no continuation left below the rendered videos.
+        Scrolls that time out or go idle are retried until ``max_stalled_scrolls``
+        of them in a row bring nothing new. In ``incremental`` mode only the video
+        renderers added since the last scroll are transferred from the browser.
+        All records found are kept in ``records``.
+        """
+        incremental = self.incremental and self._driver_is_live()
+        self.records = []
+        self._seen_ids = set()
+        self._cursor = 0
+        with self.timings.phase("extraction"):
+            new_records = self.extract_new_records() if incremental else self._new_records(self.extract_records())
+        for record in new_records:
+            if "días" in record.duration:
                 raise Exception("Please change your youtube language to English")
-        last_video_upload_date = get_timestamp_from_relative_time(upload_dates[-1])
 
-        # check if enough data has been gathered:
-        while len(video_links) < self.max_videos or last_video_upload_date > self.max_date:
+        feed_end = not self._driver_is_live()
+        stalled_scrolls = 0
+        while True:
+            self.records.extend(new_records)
+            yield from new_records
+            if feed_end:
+                print("\nNo new videos in feed. Stopped scrolling.\n")
+                break
+            if stalled_scrolls >= self.max_stalled_scrolls:
+                print("\nFeed stalled. Stopped scrolling.\n")
+                break
             print("\nScrolling down.\n")
-            print(f"New video links: {len(video_links)}")
-            print(f"{last_video_upload_date=}")
-            print(f"{self.max_date=}")
+            print(f"New video links: {len(self.records)}")
+            rendered_videos = self._cursor if incremental else len(self.records)
+            if self.cancel_token is not None:
+                self.cancel_token.raise_if_cancelled()
             self._scroll_down()
-            time.sleep(5)
-            self.source = self.driver.page_source
-            (
-                upload_dates,
-                video_links,
-                authors,
-                author_channels,
-                video_durations,
-                video_titles,
-            ) = self.extract_video_elements()
-            last_video_upload_date = get_timestamp_from_relative_time(upload_dates[-1])
+            with self.timings.phase("scroll wait"):
+                state = self.wait_for_feed(rendered_videos, self.scroll_timeout)
+            with self.timings.phase("extraction"):
+                if incremental:
+                    new_records = self.extract_new_records()
+                else:
+                    self.source = self.driver.page_source
+                    new_records = self._new_records(self.extract_records())
+            #* a timeout or idle network only means the continuation is slow to load
+            progressed = self._cursor > rendered_videos if incremental else bool(new_records)
+            stalled_scrolls = 0 if progressed else stalled_scrolls + 1
+            feed_end = state is not None and state["renderers"] > 0 and not state["continuation"] \
+                and (not incremental or self._cursor >= state["renderers"])
+
+    def _new_records(self, records: List[FeedRecord]) -> List[FeedRecord]:
+        """
+        Return the ``records`` not seen before.
+        """
+        new_records = []
+        for record in records:
+            if record.video_id in self._seen_ids:
+                continue
+            self._seen_ids.add(record.video_id)
+            new_records.append(record)
+        return new_records
+
+    def wait_for_feed(self, count, timeout):
+        """
+        Wait up to ``timeout`` seconds for more than ``count`` videos in the feed.
+        Return the last feed state, or ``None`` if ``timeout`` was reached.
+        """
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(feed_updated(count))
+        except TimeoutException:
+            return None
 
-        self.my_videos = {}
+    def _driver_is_live(self):
+        return self.driver is not None and not self._local_source
 
-        for i in range(len(video_links)):
-            try:
-                video_time = get_timestamp_from_relative_time(upload_dates[i])
-            except:
-                video_time = 0 # live video
-            if len(self.my_videos) < self.max_videos and video_time > self.max_date:
-                # print(self.max_videos, "and current dict len is: " ,len(self.my_videos))
-
-                video_id = video_links[i].split("/watch?v=")[-1].split("&")[0]
-                self.my_videos[video_id] = Video(
-                    id=video_id,
-                    title=video_titles[i],
-                    author=authors[i],
-                    author_id=author_channels[i],
-                    duration=get_sec_from_hhmmss(video_durations[i]),
-                    time=video_time,
-                )
-
-                # TODO RETURN self.my_videos AND DO THIS IN GUI, PROCESSING EVENTS
-                # alternative:
-                # see https://stackoverflow.com/questions/55088847/pyqt5-emit-signal-from-another-module
-            else:
-                break
+    def extract_new_records(self) -> List[FeedRecord]:
+        """
+        Return the records for the video renderers added to the page since the
+        last call, as compact JSON produced inside the browser.
+        """
+        payload = json.loads(self.driver.execute_script(NEW_RENDERERS_SCRIPT, self._cursor))
+        self._cursor = payload["cursor"]
+        records = [parse_renderer(renderer) for renderer in payload["renderers"]]
+        new_records = self._new_records([record for record in records if record is not None])
+        print(f"New renderers: {len(payload['renderers'])}, cursor at {self._cursor}")
+        return new_records
 
     def extract_author_thumbnails(self):
         """
@@ -327,9 +651,57 @@ class YoutubeScraper:
         for tb, tb_autor in zip(self.thumbnails, self.thumbnails_authors):
             print(tb, " - ", tb_autor)
 
-    def extract_video_elements(self):
+    def extract_records(self) -> List[FeedRecord]:
         """
         Parses the page source to get relevant video information.
+        The embedded ``ytInitialData`` is used when it covers every rendered video,
+        else the rendered markup is parsed through XPath.
+        ``ytInitialData`` only holds the first batch of the feed: videos loaded by
+        scrolling come from continuation requests, which are not in the page source.
+        Deep scrapes therefore take the XPath path after the first scroll, prefer
+        the ``incremental`` mode of ``iter_records`` for them.
+        """
+        records = records_from_source(self.source)
+        rendered_videos = self.source.count("<ytd-grid-video-renderer")
+        if records and len(records) >= rendered_videos:
+            return records
+        (
+            upload_dates,
+            video_links,
+            authors,
+            author_channels,
+            video_durations,
+            video_titles,
+        ) = self.extract_video_elements_xpath()
+        return [
+            FeedRecord(
+                video_id=link.split("/watch?v=")[-1].split("&")[0],
+                title=title,
+                author=author,
+                author_id=author_id,
+                upload_date=upload_date,
+                duration=duration,
+            ) for upload_date, link, author, author_id, duration, title in
+            zip(upload_dates, video_links, authors, author_channels, video_durations, video_titles)
+        ]
+
+    def extract_video_elements(self):
+        """
+        Return the lists of upload dates, links, authors, author channels, durations and titles
+        found in the page source.
+        """
+        records = self.extract_records()
+        upload_dates = [record.upload_date for record in records]
+        video_links = ["/watch?v=" + record.video_id for record in records]
+        authors = [record.author for record in records]
+        author_channels = [record.author_id for record in records]
+        video_durations = [record.duration for record in records]
+        video_titles = [record.title for record in records]
+        return upload_dates, video_links, authors, author_channels, video_durations, video_titles
+
+    def extract_video_elements_xpath(self):
+        """
+        Parses the rendered page source through XPath to get relevant video information.
         """
         soup = BeautifulSoup(self.source, "html.parser")
         dom = etree.HTML(str(soup))
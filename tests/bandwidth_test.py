@@ -0,0 +1,37 @@
+import threading
+import time
+
+from src.bandwidth import BandwidthBudget, TokenBucket
+
+
+def test_bucket_limits_concurrent_consumers():
+    bucket = TokenBucket(rate=100000, burst=10000)
+    start = time.monotonic()
+
+    def consume():
+        for _ in range(10):
+            bucket.consume(5000)
+
+    threads = [threading.Thread(target=consume) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    #* 200 KB at 100 KB/s, minus the initial burst
+    assert time.monotonic() - start >= 1.5
+
+
+def test_unlimited_bucket_never_blocks():
+    bucket = TokenBucket()
+    start = time.monotonic()
+    bucket.consume(10 ** 9)
+    assert time.monotonic() - start < 0.1
+
+
+def test_interactive_headroom():
+    budget = BandwidthBudget(total_rate=1000, interactive_share=0.2)
+    assert budget.media_rate() == 800
+    budget.add_interactive(1000)  # 500 B/s over the 2s window
+    assert budget.media_rate() == 500
+    budget.configure(0, 0.2)
+    assert budget.media_rate() == 0
@@ -0,0 +1,31 @@
+"""
+Compares the ``ytInitialData`` and XPath feed extraction engines.
+Usage: ``python -m tests.benchmark_feed_parser [page_source] [repeat]``
+"""
+import sys
+import timeit
+from pathlib import Path
+
+from src.feed_parser import records_from_source
+from src.resources import get_path
+from src.youtube_scraper import YoutubeScraper
+
+BASEDIR = get_path(Path(__file__).parent)
+
+
+def main():
+    source_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(BASEDIR, "test_youtube_page_source.txt")
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    scraper = YoutubeScraper(max_videos=0, max_date=0)
+    scraper.source = source_path.read_text(encoding="utf8")
+
+    json_time = timeit.timeit(lambda: records_from_source(scraper.source), number=repeat) / repeat
+    xpath_time = timeit.timeit(scraper.extract_video_elements_xpath, number=repeat) / repeat
+    print(f"videos (json):  {len(records_from_source(scraper.source))}")
+    print(f"videos (xpath): {len(scraper.extract_video_elements_xpath()[1])}")
+    print(f"json:  {json_time * 1000:.1f} ms per pass")
+    print(f"xpath: {xpath_time * 1000:.1f} ms per pass")
+
+
+if __name__ == "__main__":
+    main()
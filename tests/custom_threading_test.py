@@ -0,0 +1,84 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from src.custom_threading import CancellationToken, Cancelled, Worker
+from src import youtube_scraper
+from src.youtube_scraper import Video
+
+
+def test_cancel_terminates_child_processes():
+    token = CancellationToken()
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    token.add_process(process)
+    start = time.monotonic()
+    token.cancel()
+    assert process.wait(5) is not None
+    assert time.monotonic() - start < 5
+    with pytest.raises(Cancelled):
+        token.raise_if_cancelled()
+
+
+def test_worker_passes_its_token():
+    received = []
+    worker = Worker(lambda x, cancel_token=None: received.append((x, cancel_token)), 1)
+    worker.kill()
+    worker.run()
+    assert received == [(1, worker.cancel_token)]
+    assert worker.cancel_token.is_cancelled
+
+
+def test_cancelled_download_removes_partial_files(tmp_path):
+    token = CancellationToken()
+    video = Video("abc")
+    video._cancel_token = token
+    part_path = tmp_path / "abc.m4a.part"
+    part_path.write_bytes(b"0" * 10)
+    progress = {
+        "status": "downloading",
+        "filename": str(tmp_path / "abc.m4a"),
+        "tmpfilename": str(part_path),
+        "downloaded_bytes": 10,
+    }
+    video._progress_hook(progress)
+    token.cancel()
+    with pytest.raises(Cancelled):
+        video._progress_hook(progress)
+    video._remove_partial_files()
+    assert not part_path.exists()
+
+
+def test_child_tokens_are_cancelled_with_their_parent():
+    run = CancellationToken()
+    download, other_download = run.child(), run.child()
+    download.preempt()
+    assert download.is_cancelled and download.preempted
+    assert not run.is_cancelled and not other_download.is_cancelled
+    run.release_child(download)
+    run.cancel()
+    assert other_download.is_cancelled and not other_download.preempted
+    assert run.child().is_cancelled
+
+
+def test_cancelling_the_run_kills_the_conversion(tmp_path, monkeypatch):
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text("#!%s\nimport time\ntime.sleep(30)\n" % sys.executable)
+    ffmpeg.chmod(0o755)
+
+    class FakeFFmpeg:
+        available = True
+        executable = str(ffmpeg)
+
+    monkeypatch.setattr(youtube_scraper, "FFmpegPostProcessor", FakeFFmpeg)
+    video = Video("abc")
+    video._downloaded_file = str(tmp_path / "abc.webm")
+    run = CancellationToken()
+    conversion = threading.Thread(target=video.convert_to_mp3, kwargs={"cancel_token": run.child()})
+    conversion.start()
+    time.sleep(0.5)
+    run.cancel()
+    conversion.join(5)
+    assert not conversion.is_alive()
+    assert video.download_path is None
@@ -0,0 +1,50 @@
+import threading
+
+from src import downloader
+from src.downloader import DownloadSession
+
+
+class FakeYoutubeDL:
+    instances = []
+
+    def __init__(self, params):
+        self.params = params
+        self._progress_hooks = []
+        self.instances.append(self)
+
+    def extract_info(self, url, download):
+        info_dict = {"id": url, "ext": "m4a"}
+        for hook in self._progress_hooks:
+            hook({"status": "finished", "url": url, "format": self.params["format"]})
+        return info_dict
+
+    def prepare_filename(self, info_dict):
+        return self.params["outtmpl"] % info_dict
+
+
+def test_session_reuses_youtube_dl_per_thread(monkeypatch):
+    monkeypatch.setattr(downloader, "YoutubeDL", FakeYoutubeDL)
+    session = DownloadSession({"format": "bestaudio", "quiet": True})
+    progress = []
+
+    def download_all(prefix):
+        for i in range(5):
+            url = f"{prefix}{i}"
+            options = {"outtmpl": f"/tmp/{url}.%(ext)s"}
+            if i % 2:
+                options["format"] = "worstaudio"
+            _, filename = session.download(url, options, progress.append)
+            assert filename == f"/tmp/{url}.m4a"
+
+    threads = [threading.Thread(target=download_all, args=(prefix, )) for prefix in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert session.instances == 2
+    assert session.jobs == 10
+    assert [d["format"] for d in progress if d["url"] == "a1"] == ["worstaudio"]
+    assert [d["format"] for d in progress if d["url"] == "a2"] == ["bestaudio"]
+    for ydl in FakeYoutubeDL.instances:
+        assert ydl.params == {"format": "bestaudio", "quiet": True}
+        assert ydl._progress_hooks == []
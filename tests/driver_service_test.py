@@ -0,0 +1,93 @@
+import json
+
+from selenium.common.exceptions import WebDriverException
+from src import driver_service
+from src.driver_service import FEED_URL, DriverService
+
+
+class FakeDriverManager:
+    def install(self):
+        return str(FakeDriverManager.path)
+
+
+def test_stale_cached_driver_is_resolved_again(tmp_path, monkeypatch):
+    stale, fresh = tmp_path / "stale-chromedriver", tmp_path / "fresh-chromedriver"
+    stale.touch()
+    fresh.touch()
+    FakeDriverManager.path = fresh
+    cache_path = tmp_path / "chromedriver.json"
+    cache_path.write_text(json.dumps({"path": str(stale)}))
+    started = []
+
+    def chrome(path, options):
+        started.append(path)
+        if path == str(stale):
+            raise WebDriverException("this version of ChromeDriver only supports Chrome version 90")
+        return object()
+
+    monkeypatch.setattr(driver_service.webdriver, "Chrome", chrome)
+    monkeypatch.setattr(driver_service, "ChromeDriverManager", FakeDriverManager)
+    service = DriverService(user_data=str(tmp_path), driver_cache_path=cache_path)
+    assert service.start()
+    assert started == [str(stale), str(fresh)]
+    assert json.loads(cache_path.read_text())["path"] == str(fresh)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.urls = []
+        self.refreshes = 0
+        self.crashed = False
+        self.quitted = False
+        self.switch_to = self
+
+    def window(self, handle):
+        self.current = handle
+
+    def execute_script(self, script):
+        self.window_handles.append("tab%d" % len(self.window_handles))
+
+    def get(self, url):
+        self.urls.append(url)
+
+    def refresh(self):
+        if self.crashed:
+            raise WebDriverException("chrome not reachable")
+        self.refreshes += 1
+
+    def quit(self):
+        self.quitted = True
+
+
+def _service(tmp_path, monkeypatch):
+    chromedriver = tmp_path / "chromedriver"
+    chromedriver.touch()
+    cache_path = tmp_path / "chromedriver.json"
+    cache_path.write_text(json.dumps({"path": str(chromedriver)}))
+    browsers = []
+
+    def chrome(path, options):
+        browsers.append(FakeBrowser())
+        return browsers[-1]
+
+    monkeypatch.setattr(driver_service.webdriver, "Chrome", chrome)
+    return DriverService(user_data=str(tmp_path), driver_cache_path=cache_path), browsers
+
+
+def test_open_feed_reuses_the_feed_tab(tmp_path, monkeypatch):
+    service, browsers = _service(tmp_path, monkeypatch)
+    driver = service.open_feed()
+    assert service.open_feed() is driver
+    assert len(browsers) == 1
+    assert driver.window_handles == ["main", "tab1"] and driver.current == "tab1"
+    assert driver.urls == [FEED_URL] and driver.refreshes == 1
+
+
+def test_open_feed_restarts_a_crashed_browser(tmp_path, monkeypatch):
+    service, browsers = _service(tmp_path, monkeypatch)
+    crashed = service.open_feed()
+    crashed.crashed = True
+    driver = service.open_feed()
+    assert crashed.quitted and driver is browsers[1]
+    assert driver.urls == [FEED_URL]
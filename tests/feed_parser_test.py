@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+
+import pytest
+from src.feed_parser import extract_initial_data, parse_feed_records, records_from_source
+from src.resources import get_path
+
+BASEDIR = get_path(Path(__file__).parent)
+TEST_SOURCE_PATH = Path(BASEDIR, "test_youtube_page_source.txt")
+
+
+def _grid_video(video_id, title, style="DEFAULT"):
+    return {
+        "gridVideoRenderer": {
+            "videoId": video_id,
+            "title": {"runs": [{"text": title}]},
+            "publishedTimeText": {"simpleText": "3 hours ago"},
+            "shortBylineText": {
+                "runs": [{
+                    "text": "NewRetroWave",
+                    "navigationEndpoint": {"browseEndpoint": {"canonicalBaseUrl": "/c/NewRetroWave"}},
+                }]
+            },
+            "thumbnailOverlays": [{"thumbnailOverlayTimeStatusRenderer": {"text": {"simpleText": "4:01"}, "style": style}}],
+            "thumbnail": {"thumbnails": [{"url": "https://i.ytimg.com/vi/%s/hqdefault.jpg" % video_id}]},
+        }
+    }
+
+
+def test_records_from_initial_data():
+    data = {"contents": {"items": [_grid_video("n8o5TYmoAiA", "Ultraboss - Pronto!"), _grid_video("abc", "Live", "LIVE")]}}
+    source = "<html><script>var ytInitialData = %s;</script></html>" % json.dumps(data)
+    records = records_from_source(source)
+    assert [record.video_id for record in records] == ["n8o5TYmoAiA", "abc"]
+    assert records[0].title == "Ultraboss - Pronto!"
+    assert records[0].author == "NewRetroWave"
+    assert records[0].author_id == "/c/NewRetroWave"
+    assert records[0].duration == "4:01"
+    assert records[0].upload_date == "3 hours ago"
+    assert records[1].style == "LIVE"
+
+
+def test_channel_avatar_url():
+    video = _grid_video("abc", "A")
+    assert parse_feed_records(video)[0].author_thumbnail is None
+    video["gridVideoRenderer"]["channelThumbnailSupportedRenderers"] = {"channelThumbnailWithLinkRenderer": {
+        "thumbnail": {"thumbnails": [{"url": "//yt3.ggpht.com/avatar=s68"}]}
+    }}
+    assert parse_feed_records(video)[0].author_thumbnail == "https://yt3.ggpht.com/avatar=s68"
+
+
+def test_continuation_payload_is_deduplicated():
+    payload = {"onResponseReceivedActions": [{"appendContinuationItemsAction": {
+        "continuationItems": [_grid_video("abc", "A"), _grid_video("abc", "A"), _grid_video("def", "B")]
+    }}]}
+    assert [record.video_id for record in parse_feed_records(payload)] == ["abc", "def"]
+
+
+def test_missing_initial_data():
+    assert extract_initial_data("<html></html>") is None
+    assert records_from_source("<html></html>") == []
+
+
+@pytest.mark.skipif(not TEST_SOURCE_PATH.exists(), reason="page source sample not available")
+def test_json_engine_matches_xpath_engine():
+    from src.youtube_scraper import YoutubeScraper
+    scraper = YoutubeScraper(50, 0)
+    scraper.source = TEST_SOURCE_PATH.read_text(encoding="utf8")
+    records = records_from_source(scraper.source)
+    _, video_links, *_ = scraper.extract_video_elements_xpath()
+    if records:
+        assert {"/watch?v=" + record.video_id for record in records} <= {link.split("&")[0] for link in video_links}
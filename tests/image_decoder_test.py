@@ -0,0 +1,45 @@
+import os
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QColor, QGuiApplication, QImage
+from src.image_decoder import decode_image, round_image
+
+app = QGuiApplication.instance() or QGuiApplication([])
+
+
+def _encoded_image(width, height, fmt="JPG"):
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor("red"))
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, fmt)
+    return bytes(data)
+
+
+def test_decodes_to_target_size_keeping_aspect_ratio():
+    data = _encoded_image(640, 360)
+    assert decode_image(data, 160, 160).size().width() == 160
+    assert decode_image(data, 160, 160).size().height() == 90
+    assert decode_image(data, 0, 45).width() == 80
+    assert decode_image(data).width() == 640
+    assert decode_image(_encoded_image(40, 20, "PNG"), 160, 160).width() == 40  # never upscaled
+
+
+def test_decodes_in_worker_thread():
+    data = _encoded_image(640, 360)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(round_image(decode_image(data, 40, 40), 40, 2, QColor("white"))))
+    thread.start()
+    thread.join()
+    image = results[0]
+    assert (image.width(), image.height()) == (40, 40)
+    assert image.pixelColor(0, 0).alpha() == 0  # outside the circle
+    assert image.pixelColor(20, 20).red() > 200
+
+
+def test_invalid_data_is_a_null_image():
+    assert decode_image(b"not an image", 10, 10).isNull()
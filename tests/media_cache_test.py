@@ -0,0 +1,68 @@
+import os
+import time
+
+from src.media_cache import MediaCache
+from src.youtube_scraper import Video
+
+
+def _write(path, size):
+    path.write_bytes(b"0" * size)
+    return str(path)
+
+
+def test_lookup_prefers_given_format_order(tmp_path):
+    cache = MediaCache(tmp_path, max_size=1000)
+    cache.add("abc", _write(tmp_path / "abc.mp3", 10))
+    cache.add("abc", _write(tmp_path / "abc.m4a", 10))
+    assert cache.lookup("abc", ["m4a", "mp3"]) == str(tmp_path / "abc.m4a")
+    assert cache.lookup("abc", ["webm", "mp3"]) == str(tmp_path / "abc.mp3")
+    assert cache.lookup("other", ["mp3"]) is None
+    #* index persisted across sessions
+    assert MediaCache(tmp_path).lookup("abc", ["mp3"]) == str(tmp_path / "abc.mp3")
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    cache = MediaCache(tmp_path, max_size=25)
+    cache.add("a", _write(tmp_path / "a.mp3", 10))
+    cache.add("b", _write(tmp_path / "b.mp3", 10))
+    assert cache.lookup("a", ["mp3"])
+    cache.add("c", _write(tmp_path / "c.mp3", 10))
+    assert cache.lookup("b", ["mp3"]) is None
+    assert not (tmp_path / "b.mp3").exists()
+    assert cache.lookup("a", ["mp3"]) and cache.lookup("c", ["mp3"])
+    cache.max_size = 10
+    assert cache.total_size() == 10
+
+
+def test_partial_files_are_dropped_on_open(tmp_path):
+    cache = MediaCache(tmp_path)
+    cache.add("a", _write(tmp_path / "a.mp3", 10))
+    _write(tmp_path / "a.mp3", 5)  # truncated
+    old_part = _write(tmp_path / "b.m4a.part", 5)
+    recent_part = _write(tmp_path / "c.m4a.part", 5)
+    two_hours_ago = time.time() - 2 * 3600
+    os.utime(old_part, (two_hours_ago, two_hours_ago))
+    cache = MediaCache(tmp_path)
+    assert cache.lookup("a", ["mp3"]) is None
+    assert not os.path.exists(old_part)
+    assert os.path.exists(recent_part)  # may still be downloading
+
+
+def test_cached_video_is_not_downloaded(tmp_path):
+    cache = MediaCache(tmp_path)
+    cache.add("abc", _write(tmp_path / "abc.m4a", 10))
+    video = Video("abc")
+    video.start_download(str(tmp_path), native_formats=["m4a"], media_cache=cache)
+    assert video.download_path == str(tmp_path / "abc.m4a")
+    assert video.is_downloaded
+    assert not hasattr(video, "ydl_opts")
+
+
+def test_clear_deletes_leftover_partial_files(tmp_path):
+    cache = MediaCache(tmp_path)
+    cache.add("abc", _write(tmp_path / "abc.mp3", 10))
+    _write(tmp_path / "def.m4a.part", 5)
+    _write(tmp_path / "def.m4a.ytdl", 5)
+    cache.clear()
+    assert sorted(os.listdir(tmp_path)) == ["index.json"]
+    assert cache.total_size() == 0
@@ -0,0 +1,86 @@
+import threading
+import time
+
+from src.metadata import MetadataCache, MetadataFetcher
+from src.youtube_scraper import Video
+
+
+NOW = 1619255833
+
+
+class FakeYoutubeDL:
+    def __init__(self, info_dict):
+        self.info_dict = info_dict
+
+    def extract_info(self, url, download):
+        return self.info_dict
+
+
+class SlowVideo(Video):
+    def __init__(self, id, delay, fail=False):
+        super().__init__(id)
+        self.delay = delay
+        self.fail = fail
+        self.ydl = None
+
+    def download_video_metadata(self, ydl=None):
+        time.sleep(self.delay)
+        if self.fail:
+            raise Exception("Premiere")
+        self.ydl = ydl
+        self.thread = threading.current_thread()
+
+
+def test_youtube_dl_is_shared_per_thread():
+    fetcher = MetadataFetcher()
+    videos = [SlowVideo(str(i), 0.01) for i in range(10)]
+    threads = [threading.Thread(target=lambda videos=videos[i::2]: [fetcher.fetch_one(video) for video in videos]) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ydl_per_thread = {}
+    for video in videos:
+        assert ydl_per_thread.setdefault(video.thread, video.ydl) is video.ydl
+    assert len(ydl_per_thread) == 2
+
+
+def test_fetched_metadata_fills_later_videos_from_cache(tmp_path):
+    cache = MetadataCache(tmp_path / "metadata.sqlite3")
+    video = SlowVideo("n8o5TYmoAiA", 0.0)
+    video.thumbnail, video.duration = "https://i.ytimg.com/vi/n8o5TYmoAiA/hqdefault.jpg", 241
+    video.upload_time = 1619255833
+    MetadataFetcher(cache=cache).fetch_one(video)
+
+    cached_video = SlowVideo("n8o5TYmoAiA", 0.0, fail=True)  # any request would fail
+    assert cache.fill(cached_video)
+    assert cached_video.duration == 241
+    assert cached_video.time == 1619255833
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_cache_field_ttl_and_eviction(tmp_path):
+    cache = MetadataCache(tmp_path / "metadata.sqlite3", max_entries=2, ttls={"thumbnail": 0})
+    for video_id in ("a", "b", "c"):
+        video = Video(video_id, duration=10)
+        video.thumbnail = "url"
+        cache.store(video)
+    assert not cache.fill(Video("c"))  # expired thumbnail
+    assert cache._connection.execute("SELECT COUNT(*) FROM videos").fetchone()[0] == 2
+
+
+def test_only_the_upload_time_is_cached(tmp_path):
+    cache = MetadataCache(tmp_path / "metadata.sqlite3")
+    video = Video("a", time=NOW, duration=10)
+    video.thumbnail = "url"
+    cache.store(video)
+    cached_video = Video("a", time=NOW + 60)
+    cache.fill(cached_video)
+    assert cached_video.time == NOW + 60  # relative estimates are not cached
+
+    video.download_video_metadata(ydl=FakeYoutubeDL({"thumbnail": "url", "duration": 10, "upload_date": "20210424"}))
+    assert video.upload_time == 1619222400
+    video.download_video_metadata(ydl=FakeYoutubeDL({"thumbnail": "url", "duration": 10, "timestamp": NOW, "upload_date": "20210424"}))
+    cache.store(video)
+    cache.fill(cached_video)
+    assert cached_video.time == cached_video.upload_time == NOW
@@ -0,0 +1,158 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QObject, QTimer
+from src.networking import CustomNetworkManager, Sender
+
+BODY = b"thumbnail" * 100
+
+
+class CacheableHandler(BaseHTTPRequestHandler):
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.send_header("Cache-Control", "max-age=3600")
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SlowHandler(CacheableHandler):
+    def do_GET(self):
+        time.sleep(0.5)
+        super().do_GET()
+
+
+class MissingHandler(CacheableHandler):
+    def do_GET(self):
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def _download(manager, url):
+    loop = QEventLoop()
+    received = []
+    manager.downloaded.connect(lambda sender, data: (received.append(bytes(data)), loop.quit()))
+    manager.start_download(url, Sender("test", QObject()))
+    QTimer.singleShot(5000, loop.quit)
+    loop.exec_()
+    manager.downloaded.disconnect()
+    return received
+
+
+def test_fresh_replies_come_from_disk_cache(tmp_path):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CacheableHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/thumbnail.jpg"
+    try:
+        manager = CustomNetworkManager(cache_dir=tmp_path)
+        assert _download(manager, url) == [BODY]
+        assert _download(manager, url) == [BODY]
+        assert (manager.hits, manager.misses) == (1, 1)
+        assert manager.bytes_saved == len(BODY)
+        assert CacheableHandler.requests == 1
+
+        #* another window reads the same cache
+        other_manager = CustomNetworkManager(cache_dir=tmp_path)
+        assert _download(other_manager, url) == [BODY]
+        assert other_manager.hits == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_aborted_requests_are_not_delivered(tmp_path):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/thumbnail.jpg"
+    try:
+        manager = CustomNetworkManager(cache_dir=tmp_path)
+        received = []
+        manager.downloaded.connect(lambda sender, data: received.append(sender))
+        aborted, kept = Sender("test", QObject()), Sender("test", QObject())
+        manager.start_download(url, aborted)
+        manager.start_download(url + "?kept", kept)
+        manager.abort(aborted)
+        loop = QEventLoop()
+        manager.downloaded.connect(loop.quit)
+        QTimer.singleShot(5000, loop.quit)
+        loop.exec_()
+        assert received == [kept]
+        assert manager.in_flight() == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_requests_are_coalesced_and_limited_per_host(tmp_path):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    SlowHandler.requests = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/avatar.jpg"
+    try:
+        manager = CustomNetworkManager(cache_dir=tmp_path, max_per_host=1)
+        received = []
+        loop = QEventLoop()
+
+        def on_downloaded(sender, data):
+            received.append(sender)
+            if len(received) == 3:
+                loop.quit()
+
+        manager.downloaded.connect(on_downloaded)
+        senders = [Sender("test", QObject()) for _ in range(4)]
+        for sender in senders[:3]:
+            manager.start_download(url, sender)
+        manager.start_download(url + "?other", senders[3])
+        assert (manager.in_flight(), manager.queued()) == (1, 1)
+
+        #* one waiting sender leaving doesn't cancel the shared request
+        manager.abort(senders[1])
+        aborted = Sender("test", QObject())
+        manager.start_download(url + "?aborted", aborted)
+        manager.abort(aborted)
+        assert manager.queued() == 1
+
+        QTimer.singleShot(5000, loop.quit)
+        loop.exec_()
+        assert sorted(received, key=senders.index) == [senders[0], senders[2], senders[3]]
+        assert SlowHandler.requests == 2
+        assert manager.coalesced == 2
+        assert (manager.in_flight(), manager.queued()) == (0, 0)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_senders_of_failed_requests_are_notified(tmp_path):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MissingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/thumbnail.jpg"
+    try:
+        manager = CustomNetworkManager(cache_size=0)
+        senders = [Sender("test", QObject()), Sender("test", QObject())]
+        loop = QEventLoop()
+        failed, received = [], []
+        manager.failed.connect(lambda sender: (failed.append(sender), len(failed) == 2 and loop.quit()))
+        manager.downloaded.connect(lambda sender, data: received.append(sender))
+        for sender in senders:
+            manager.start_download(url, sender)
+        QTimer.singleShot(5000, loop.quit)
+        loop.exec_()
+        assert failed == senders and received == []
+        assert manager.in_flight() == 0
+    finally:
+        server.shutdown()
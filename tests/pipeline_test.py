@@ -0,0 +1,107 @@
+import threading
+import time
+
+from src.pipeline import Pipeline, Stage
+from src.scheduler import PriorityJobQueue
+
+
+def test_items_flow_through_every_stage():
+    results = []
+    lock = threading.Lock()
+
+    def collect(item):
+        with lock:
+            results.append(item)
+
+    pipeline = Pipeline(
+        [Stage("double", lambda x: x * 2, workers=3), Stage("odd_only", lambda x: x if x % 4 else None, workers=2)],
+        on_result=collect,
+    ).start()
+    pipeline.feed(range(20))
+    assert pipeline.join(timeout=5)
+    assert sorted(results) == [x * 2 for x in range(20) if (x * 2) % 4]
+    stats = pipeline.stats()
+    assert stats["double"]["processed"] == 20
+    assert stats["odd_only"]["processed"] == 20
+    assert stats["odd_only"]["queue_depth"] == 0
+
+
+def test_full_stage_applies_backpressure():
+    release = threading.Event()
+    pipeline = Pipeline([
+        Stage("fast", lambda x: x, workers=1, queue_size=2),
+        Stage("slow", lambda x: release.wait(5), workers=1, queue_size=2),
+    ]).start()
+    fed = []
+    producer = threading.Thread(target=lambda: [fed.append(pipeline.put(i)) for i in range(20)], daemon=True)
+    producer.start()
+    time.sleep(0.5)
+    #* slow worker + its queue + fast worker + its queue
+    assert len(fed) <= 6
+    release.set()
+    producer.join(5)
+    pipeline.close()
+    assert pipeline.join(timeout=5)
+    assert pipeline["slow"].processed == 20
+
+
+def test_unbounded_stage_does_not_hold_back_the_previous_one():
+    release = threading.Event()
+    pipeline = Pipeline([
+        Stage("list", lambda x: x, workers=2, queue_size=2),
+        Stage("download", lambda x: release.wait(5), workers=1, queue_size=0),
+    ]).start()
+    pipeline.feed(range(100))
+    assert pipeline.join(timeout=2, stage="list")
+    assert pipeline["download"].stats()["queue_depth"] >= 98
+    release.set()
+    assert pipeline.join(timeout=5)
+
+
+def test_errors_are_counted_and_reported():
+    errors = []
+
+    def fail_on_odd(x):
+        if x % 2:
+            raise ValueError(x)
+        return x
+
+    pipeline = Pipeline([Stage("check", fail_on_odd, workers=2)], on_error=lambda stage, item, error: errors.append(item))
+    pipeline.start().feed(range(6))
+    assert pipeline.join(timeout=5)
+    assert sorted(errors) == [1, 3, 5]
+    assert pipeline["check"].failed == 3
+
+
+def test_stop_drops_pending_items():
+    pipeline = Pipeline([Stage("sleep", lambda x: time.sleep(0.05), workers=1, queue_size=100)]).start()
+    for i in range(50):
+        pipeline.put(i)
+    pipeline.stop()
+    assert pipeline.join(timeout=2)
+    assert pipeline["sleep"].processed < 50
+
+
+def test_prioritized_items_are_processed_first():
+    started = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def process(item):
+        if item == "blocker":
+            started.set()
+            release.wait(5)
+        order.append(item)
+
+    pipeline = Pipeline([
+        Stage("ordered", process, workers=1, queue_size=100, queue_factory=lambda size: PriorityJobQueue(size, key=str))
+    ]).start()
+    pipeline.put("blocker")
+    assert started.wait(5)
+    for item in ["a", "b", "c", "d"]:
+        pipeline.put(item)
+    pipeline.close()
+    pipeline["ordered"].queue.prioritize(["c", "d"])
+    release.set()
+    assert pipeline.join(timeout=5)
+    assert order == ["blocker", "c", "d", "a", "b"]
@@ -0,0 +1,36 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtGui import QGuiApplication, QPixmap
+from src.pixmap_cache import PixmapCache
+
+app = QGuiApplication.instance() or QGuiApplication([])
+
+
+def _pixmap(width, height):
+    pixmap = QPixmap(width, height)
+    pixmap.fill()
+    return pixmap
+
+
+def test_least_recently_used_pixmaps_are_evicted():
+    cost = PixmapCache.cost(_pixmap(10, 10))
+    cache = PixmapCache(max_size=2 * cost)
+    cache.put(("a", 10, 10, "thumbnail"), _pixmap(10, 10))
+    cache.put(("b", 10, 10, "thumbnail"), _pixmap(10, 10))
+    assert cache.get(("a", 10, 10, "thumbnail")) is not None
+    cache.put(("c", 10, 10, "thumbnail"), _pixmap(10, 10))
+    assert ("b", 10, 10, "thumbnail") not in cache
+    assert ("a", 10, 10, "thumbnail") in cache
+    assert cache.size == 2 * cost
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_size_and_shape_are_part_of_the_key():
+    cache = PixmapCache()
+    cache.put(("a", 10, 10, "thumbnail"), _pixmap(10, 10))
+    assert cache.get(("a", 20, 20, "thumbnail")) is None
+    assert cache.get(("a", 10, 10, "round")) is None
+    cache.max_size = 0
+    assert cache.size == 0
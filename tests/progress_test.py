@@ -0,0 +1,44 @@
+import time
+
+from src.progress import ProgressThrottle, TransferMeter, format_rate
+from src.youtube_scraper import Video
+
+
+class FakeSignal:
+    def __init__(self):
+        self.values = []
+
+    def emit(self, value):
+        self.values.append(value)
+
+
+class FakeSignals:
+    def __init__(self):
+        self.progress = FakeSignal()
+
+
+def test_throttle_lets_final_update_through():
+    throttle = ProgressThrottle(interval=10)
+    assert throttle.ready()
+    assert not throttle.ready()
+    assert throttle.ready(final=True)
+
+
+def test_progress_hook_emits_few_updates():
+    video = Video("abc")
+    video.progress_signals = FakeSignals()
+    for downloaded in range(0, 1000, 10):
+        video._progress_hook({"status": "downloading", "downloaded_bytes": downloaded, "total_bytes": 1000})
+    video._progress_hook({"status": "finished", "downloaded_bytes": 1000, "total_bytes": 1000})
+    assert video.progress_signals.progress.values == [0, 100]
+
+
+def test_transfer_meter_rate():
+    meter = TransferMeter(window=0.2)
+    meter.add(1000)
+    meter.add(1000)
+    assert meter.rate() == 10000
+    time.sleep(0.3)
+    assert meter.rate() == 0
+    assert meter.total_bytes == 2000
+    assert format_rate(2.5 * 1024 * 1024) == "2.5 MB/s"
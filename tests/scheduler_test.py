@@ -0,0 +1,58 @@
+from src.custom_threading import CancellationToken
+from src.scheduler import DEFAULT_RANK, Prefetcher, PriorityJobQueue, viewport_rows
+
+
+class Job:
+    def __init__(self, id):
+        self.id = id
+
+
+def test_prefetch_window_wraps_around():
+    prefetcher = Prefetcher(ahead=2, behind=1)
+    assert prefetcher.window(0, 5) == [0, 1, 2, 4]
+    assert prefetcher.window(4, 5) == [4, 0, 1, 3]
+    assert prefetcher.window(-1, 5) == [0, 1, 2, 4]
+    assert prefetcher.window(0, 2) == [0, 1]
+    assert prefetcher.window(0, 0) == []
+
+
+def test_jump_resets_previous_window():
+    jobs = PriorityJobQueue()
+    for id in "abcdefgh":
+        jobs.put(Job(id))
+    end_of_stream = object()
+    jobs.put(end_of_stream)
+    prefetcher = Prefetcher([jobs], ahead=1, behind=0)
+    prefetcher.update(5, list("abcdefgh"))
+    assert [job.id for job in jobs.pending()[:2]] == ["f", "g"]
+    prefetcher.update(1, list("abcdefgh"))
+    assert [getattr(job, "id", None) for job in jobs.pending()] == list("bcadefgh") + [None]
+    assert jobs._rank(Job("f")) == DEFAULT_RANK
+
+
+def test_viewport_rows_visible_first_then_margin():
+    assert viewport_rows(10, 12, 100, margin=2) == [10, 11, 12, 13, 14, 9, 8]
+    assert viewport_rows(0, 2, 4, margin=5) == [0, 1, 2, 3]
+    assert viewport_rows(-1, -1, 3) == [0]
+    assert viewport_rows(0, 0, 0) == []
+
+
+def test_rank_applies_to_jobs_queued_later():
+    jobs = PriorityJobQueue()
+    jobs.put(Job("a"))
+    jobs.prioritize(["c"])
+    jobs.put(Job("b"))
+    jobs.put(Job("c"))  # e.g. still in the metadata stage when selected
+    assert [job.id for job in jobs.pending()] == ["c", "a", "b"]
+
+
+def test_jump_preempts_running_jobs_outside_the_window():
+    jobs = PriorityJobQueue()
+    for id in "gh":
+        jobs.put(Job(id))
+    running = {id: CancellationToken() for id in "abc"}
+    prefetcher = Prefetcher([jobs], ahead=1, behind=0)
+    assert prefetcher.preempt(6, list("abcdefgh"), jobs, running) == ["a", "b"]
+    assert [id for id, token in running.items() if token.preempted] == ["a", "b"]
+    #* nothing waits for a worker
+    assert prefetcher.preempt(0, list("abcdefgh"), PriorityJobQueue(), running) == []
@@ -1,9 +1,24 @@
+import json
 import time
 from pathlib import Path
 
 import pytest
+from src import downloader
+from src.checkpoint import FeedCheckpoint
+from src.custom_threading import WorkerSignals
+from src.feed_parser import FEED_STATE_SCRIPT, NEW_RENDERERS_SCRIPT
 from src.resources import get_path
-from src.youtube_scraper import YoutubeScraper
+from src.youtube_scraper import Video, YoutubeScraper, feed_updated
+from tests.feed_parser_test import _grid_video
+
+NOW = 1619255833
+
+
+def _feed_source(tmp_path, video_ids):
+    data = {"items": [_grid_video(video_id, video_id) for video_id in video_ids]}
+    source_path = tmp_path / "source.html"
+    source_path.write_text("<script>var ytInitialData = %s;</script>" % json.dumps(data), encoding="utf8")
+    return str(source_path)
 
 
 def test_scrape():
@@ -22,3 +37,163 @@ def test_scrape():
     assert my_videos["n8o5TYmoAiA"].author == "NewRetroWave"
     assert my_videos["n8o5TYmoAiA"].author_id == "/c/NewRetroWave"
     assert my_videos["n8o5TYmoAiA"].url == "https://www.youtube.com/watch?v=n8o5TYmoAiA"
+
+
+def test_scrape_stops_at_checkpoint(tmp_path):
+    source_path = _feed_source(tmp_path, ("new1", "new2", "seen", "older"))
+    scraper = YoutubeScraper(50, 0, last_video_id="seen")
+    my_videos = scraper.get_videos_from_feed(local_dir=source_path)
+    assert list(my_videos) == ["new1", "new2"]
+    assert my_videos["new1"].thumbnail == "https://i.ytimg.com/vi/new1/mqdefault.jpg"
+    assert not my_videos["new1"].is_live and not my_videos["new1"].is_upcoming
+
+
+def test_checkpoint_is_persisted(tmp_path):
+    path = tmp_path / "checkpoints.json"
+    FeedCheckpoint(path).set("profile", "n8o5TYmoAiA", NOW)
+    assert FeedCheckpoint(path).get("profile") == {"video_id": "n8o5TYmoAiA", "time": NOW}
+    assert FeedCheckpoint(path).get("other profile") is None
+
+
+def test_iter_videos_from_feed_streams_filtered_videos(tmp_path):
+    source_path = _feed_source(tmp_path, ("a", "b", "a", "c"))
+    scraper = YoutubeScraper(2, 0)
+    assert [video.id for video in scraper.iter_videos_from_feed(local_dir=source_path)] == ["a", "b"]
+
+
+def test_native_audio_download_skips_conversion(tmp_path, monkeypatch):
+    class FakeYoutubeDL:
+        def __init__(self, params):
+            self.params = params
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        def extract_info(self, url, download):
+            return {"ext": "m4a", "duration": 10}
+
+        def prepare_filename(self, info_dict):
+            return self.params["outtmpl"] % info_dict
+
+    monkeypatch.setattr(downloader, "YoutubeDL", FakeYoutubeDL)
+    video = Video("abc", title="title")
+    video.start_download(str(tmp_path), native_formats=["m4a", "webm"])
+    assert video.ydl_opts["format"] == "bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio"
+    assert not video.needs_conversion
+    assert video.download_path == str(tmp_path / "abc.m4a")
+
+    #* unplayable stream, conversion left to the caller
+    video = Video("abc", title="title")
+    video.start_download(str(tmp_path), native_formats=["webm"], convert_later=True)
+    assert video.needs_conversion
+    assert video.download_path is None
+
+
+def test_failed_download_hides_progress():
+    video = Video("abc", title="title")
+    video.progress_signals = WorkerSignals()
+    progress = []
+    video.progress_signals.progress.connect(progress.append)
+    video.set_download_state("download_fail")
+    assert video.download_state == "download_fail" and progress == [100]
+
+
+class FakeDriver:
+    def __init__(self, state):
+        self.state = state
+
+    def execute_script(self, script, *args):
+        return self.state
+
+
+def test_feed_not_rendered_yet_is_not_the_end():
+    condition = feed_updated(0, idle_time=60)
+    assert condition(FakeDriver({"renderers": 0, "continuation": False, "resources": 1})) is False
+    state = {"renderers": 5, "continuation": False, "resources": 1}
+    assert feed_updated(5, idle_time=60)(FakeDriver(state)) == state
+
+
+def test_scrape_stops_at_checkpoint_time_if_checkpoint_is_gone(tmp_path):
+    source_path = _feed_source(tmp_path, ("new1", "new2"))
+    scraper = YoutubeScraper(50, 0, last_video_id="removed", last_video_time=time.time() - 4 * 3600)
+    assert list(scraper.get_videos_from_feed(local_dir=source_path)) == ["new1", "new2"]
+    scraper = YoutubeScraper(50, 0, last_video_id="removed", last_video_time=time.time() - 2 * 3600)
+    assert list(scraper.get_videos_from_feed(local_dir=source_path)) == []
+
+
+class FakeFeedDriver:
+    """
+    Feed page whose ``elements`` hold the renderer data, ``None`` while an
+    element is not hydrated yet. Each scroll appends the next of ``pages``.
+    """
+    def __init__(self, elements=(), pages=()):
+        self.elements = list(elements)
+        self.pages = list(pages)
+        self.cursors = []
+        self.scrolls = 0
+
+    def find_element_by_tag_name(self, name):
+        return self
+
+    def send_keys(self, *keys):
+        self.scrolls += 1
+        if self.pages:
+            self.elements += self.pages.pop(0)
+
+    def execute_script(self, script, *args):
+        if script == NEW_RENDERERS_SCRIPT:
+            cursor = args[0]
+            self.cursors.append(cursor)
+            renderers = []
+            while cursor < len(self.elements) and self.elements[cursor] is not None:
+                renderers.append(self.elements[cursor])
+                cursor += 1
+            return json.dumps({"cursor": cursor, "renderers": renderers})
+        if script == FEED_STATE_SCRIPT:
+            return {"renderers": len(self.elements), "continuation": bool(self.pages), "resources": 0}
+        raise AssertionError("unexpected script")
+
+
+def _renderer(video_id):
+    return _grid_video(video_id, video_id)["gridVideoRenderer"]
+
+
+def test_extract_new_records_resumes_at_cursor():
+    driver = FakeFeedDriver([_renderer("a"), _renderer("b")])
+    scraper = YoutubeScraper(50, 0)
+    scraper.driver = driver
+    extracted = [record.video_id for record in scraper.extract_new_records()]
+    assert extracted == ["a", "b"]
+
+    #* duplicate of an earlier video, then an element without data
+    driver.elements += [_renderer("b"), None, _renderer("c")]
+    assert scraper.extract_new_records() == []
+    assert scraper._cursor == 3
+
+    driver.elements[3] = _renderer("d")
+    extracted += [record.video_id for record in scraper.extract_new_records()]
+    assert scraper.extract_new_records() == []
+    assert extracted == ["a", "b", "d", "c"]
+    assert driver.cursors == [0, 2, 3, 5]
+
+
+def _scrape_live(driver, **kwargs):
+    scraper = YoutubeScraper(50, 0, scroll_timeout=0.3, **kwargs)
+    scraper.driver = driver
+    return [record.video_id for record in scraper.iter_records()]
+
+
+def test_slow_continuation_is_scrolled_again():
+    #* the second scroll times out before the continuation loads
+    driver = FakeFeedDriver([_renderer("a")], pages=[[_renderer("b")], [], [_renderer("c")]])
+    assert _scrape_live(driver) == ["a", "b", "c"]
+    assert driver.scrolls == 3
+
+
+def test_stalled_feed_stops_scrolling():
+    driver = FakeFeedDriver([_renderer("a")], pages=[[]] * 10)
+    assert _scrape_live(driver, max_stalled_scrolls=2) == ["a"]
+    assert driver.scrolls == 2
@@ -0,0 +1,91 @@
+import threading
+import time
+import urllib.request
+
+from src.streaming import StreamServer
+from src.youtube_scraper import Video
+
+DATA = bytes(range(256)) * 1024
+
+
+def _start_download(tmp_path, video):
+    """
+    Writes ``DATA`` to a growing ``.part`` file, then renames it like youtube-dl.
+    """
+    final_path = tmp_path / f"{video.id}.m4a"
+    part_path = tmp_path / f"{video.id}.m4a.part"
+
+    def download():
+        step = len(DATA) // 8
+        for position in range(0, len(DATA), step):
+            with open(part_path, "ab") as f:
+                f.write(DATA[position:position + step])
+            video._progress_hook({
+                "status": "downloading",
+                "filename": str(final_path),
+                "tmpfilename": str(part_path),
+                "downloaded_bytes": position + step,
+                "total_bytes": len(DATA),
+            })
+            time.sleep(0.05)
+        part_path.rename(final_path)
+        video._progress_hook({"status": "finished", "filename": str(final_path), "total_bytes": len(DATA)})
+
+    video._progress_hook({
+        "status": "downloading",
+        "filename": str(final_path),
+        "tmpfilename": str(part_path),
+        "downloaded_bytes": 0,
+        "total_bytes": len(DATA),
+    })
+    thread = threading.Thread(target=download, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_stream_serves_download_in_progress(tmp_path):
+    server = StreamServer(wait_timeout=5)
+    video = Video("abc")
+    download = _start_download(tmp_path, video)
+    try:
+        with urllib.request.urlopen(server.url(video), timeout=10) as response:
+            assert response.headers["Content-Length"] == str(len(DATA))
+            assert response.read() == DATA
+        download.join(5)
+        assert server.is_ready(video)
+    finally:
+        server.close()
+
+
+def test_stream_range_past_downloaded_bytes_waits(tmp_path):
+    server = StreamServer(wait_timeout=5)
+    video = Video("abc")
+    download = _start_download(tmp_path, video)
+    try:
+        request = urllib.request.Request(server.url(video), headers={"Range": "bytes=200000-"})
+        with urllib.request.urlopen(request, timeout=10) as response:
+            assert response.status == 206
+            assert response.headers["Content-Range"] == f"bytes 200000-{len(DATA) - 1}/{len(DATA)}"
+            assert response.read() == DATA[200000:]
+        download.join(5)
+    finally:
+        server.close()
+
+
+def test_converted_download_is_kept_until_stream_is_released(tmp_path):
+    server = StreamServer(wait_timeout=5)
+    video, other_video = Video("abc"), Video("def")
+    download = _start_download(tmp_path, video)
+    try:
+        url = server.url(video)
+        download.join(5)
+        video._remove_source(video.stream_filename)  # as after its conversion to mp3
+        with urllib.request.urlopen(url, timeout=10) as response:
+            assert response.read() == DATA
+        _start_download(tmp_path, other_video).join(5)
+        server.url(other_video)  # the player moved on
+        assert server.get("abc") is None
+        assert not (tmp_path / "abc.m4a").exists()
+    finally:
+        server.close()
+    assert (tmp_path / "def.m4a").exists()  # never converted